@@ -0,0 +1,299 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.api.response_cache import ENDPOINT_TTLS
+
+CATALOG_PATH = Path(os.environ.get("MOODFLOW_CATALOG_DB", "data/cache/spotify_catalog.db"))
+
+# entries older than their TTL are still served (and refreshed in the background)
+# for this long; past it they count as missing
+MAX_STALE_SECONDS = 30 * 24 * 3600
+
+# a refresh claimed by some process is considered abandoned after this long
+REFRESH_CLAIM_SECONDS = 60
+
+# search result containers and the record kind stored for their items
+CONTAINER_KINDS = {"tracks": "track", "artists": "artist", "albums": "album", "playlists": "playlist"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (kind, id)
+);
+CREATE TABLE IF NOT EXISTS queries (
+    key TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    shape TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    refresh_claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS queries_accessed ON queries (accessed_at);
+CREATE INDEX IF NOT EXISTS records_accessed ON records (accessed_at);
+"""
+
+
+class CatalogStore:
+    """
+    On-disk Spotify catalog shared by every worker process on the machine.
+
+    Responses are split into normalised track / artist / album / playlist
+    records plus a query -> result-ID mapping, so an artist seen in a search,
+    a related-artists list and an artist() lookup is stored once.
+    SQLite runs in WAL mode, so readers in other processes never block on a
+    writer. The file is bounded by max_bytes; the least recently read
+    queries and records are evicted first.
+    """
+
+    def __init__(
+        self,
+        path: Path = CATALOG_PATH,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttls = dict(ENDPOINT_TTLS if ttls is None else ttls)
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.executescript(SCHEMA)
+
+    # ---------------------------
+    # Connections
+    # ---------------------------
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    # ---------------------------
+    # Lookup
+    # ---------------------------
+    def get(self, key: str, now: Optional[float] = None) -> Optional[Tuple[Any, bool]]:
+        """
+        (response, is_fresh) for a stored query, or None if unknown,
+        too old to serve, or one of its records has been evicted.
+        """
+        now = time.time() if now is None else now
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT shape, expires_at, accessed_at FROM queries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        shape, expires_at, accessed_at = json.loads(row[0]), row[1], row[2]
+        if now - expires_at > MAX_STALE_SECONDS:
+            return None
+
+        response = self._rebuild(conn, shape)
+        if response is None:
+            return None
+
+        # only touch access times occasionally, reads should not turn into writes
+        if now - accessed_at > 3600:
+            conn.execute("UPDATE queries SET accessed_at = ? WHERE key = ?", (now, key))
+
+        return response, expires_at > now
+
+    def put(self, key: str, endpoint: str, response: Any, now: Optional[float] = None) -> None:
+        if response is None:
+            return
+        now = time.time() if now is None else now
+        records, shape = _split(endpoint, response)
+        ttl = self.ttls.get(endpoint, 0)
+
+        conn = self._conn()
+        with _transaction(conn):
+            conn.executemany(
+                "INSERT INTO records (kind, id, data, updated_at, accessed_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (kind, id) DO UPDATE SET data = excluded.data, "
+                "updated_at = excluded.updated_at, accessed_at = excluded.accessed_at",
+                [(kind, rid, json.dumps(data), now, now) for kind, rid, data in records],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO queries "
+                "(key, endpoint, shape, fetched_at, expires_at, accessed_at, refresh_claimed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, NULL)",
+                (key, endpoint, json.dumps(shape), now, now + ttl, now),
+            )
+
+        with self._writes_lock:
+            self._writes += 1
+            check = self._writes % 100 == 0
+        if check:
+            self.evict()
+
+    def claim_refresh(self, key: str, now: Optional[float] = None) -> bool:
+        """
+        True for exactly one caller across all processes sharing the file,
+        so a stale entry is refreshed once rather than by every worker.
+        """
+        now = time.time() if now is None else now
+        cur = self._conn().execute(
+            "UPDATE queries SET refresh_claimed_at = ? WHERE key = ? "
+            "AND (refresh_claimed_at IS NULL OR refresh_claimed_at < ?)",
+            (now, key, now - REFRESH_CLAIM_SECONDS),
+        )
+        return cur.rowcount == 1
+
+    # ---------------------------
+    # Size bound
+    # ---------------------------
+    def size_bytes(self) -> int:
+        conn = self._conn()
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return (pages - free) * page_size
+
+    def evict(self) -> None:
+        conn = self._conn()
+        while self.size_bytes() > self.max_bytes:
+            with _transaction(conn):
+                n_queries = conn.execute("SELECT COUNT(*) FROM queries").fetchone()[0]
+                n_records = conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+                if n_queries == 0 and n_records == 0:
+                    break
+                conn.execute(
+                    "DELETE FROM queries WHERE key IN "
+                    "(SELECT key FROM queries ORDER BY accessed_at LIMIT ?)",
+                    (max(1, n_queries // 10),),
+                )
+                conn.execute(
+                    "DELETE FROM records WHERE rowid IN "
+                    "(SELECT rowid FROM records ORDER BY accessed_at LIMIT ?)",
+                    (max(1, n_records // 10),),
+                )
+        conn.execute("PRAGMA incremental_vacuum")
+
+    # ---------------------------
+    # Reassembly
+    # ---------------------------
+    def _rebuild(self, conn: sqlite3.Connection, shape: Dict[str, Any]) -> Optional[Any]:
+        wanted = set()
+        for kind, ids in _shape_refs(shape):
+            wanted.update((kind, rid) for rid in ids if rid is not None)
+
+        found: Dict[Tuple[str, str], Any] = {}
+        by_kind: Dict[str, List[str]] = {}
+        for kind, rid in wanted:
+            by_kind.setdefault(kind, []).append(rid)
+        for kind, ids in by_kind.items():
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT id, data FROM records WHERE kind = ? AND id IN ({','.join('?' * len(chunk))})",
+                    [kind] + chunk,
+                ).fetchall()
+                found.update(((kind, rid), json.loads(data)) for rid, data in rows)
+
+        if len(found) < len(wanted):
+            return None
+
+        if "single" in shape:
+            return found[(shape["single"], shape["id"])]
+        if "list" in shape:
+            kind = CONTAINER_KINDS[shape["list"]]
+            return {shape["list"]: [found[(kind, rid)] for rid in shape["ids"]]}
+
+        response: Dict[str, Any] = {}
+        for container, part in shape["containers"].items():
+            kind = CONTAINER_KINDS[container]
+            response[container] = dict(part["meta"])
+            response[container]["items"] = [
+                None if rid is None else found[(kind, rid)] for rid in part["ids"]
+            ]
+        return response
+
+
+def _split(endpoint: str, response: Any) -> Tuple[List[Tuple[str, str, Any]], Dict[str, Any]]:
+    """
+    Break a response into (kind, id, record) rows and a shape that can rebuild it.
+    """
+    records: List[Tuple[str, str, Any]] = []
+
+    if endpoint in ("artist", "track"):
+        records.append((endpoint, response["id"], response))
+        return records, {"single": endpoint, "id": response["id"]}
+
+    if endpoint == "artist_related_artists":
+        items = [a for a in response.get("artists", []) if a]
+        records.extend(("artist", a["id"], a) for a in items)
+        return records, {"list": "artists", "ids": [a["id"] for a in items]}
+
+    containers: Dict[str, Any] = {}
+    for container, kind in CONTAINER_KINDS.items():
+        if container not in response:
+            continue
+        part = response[container] or {}
+        ids: List[Optional[str]] = []
+        for item in part.get("items", []):
+            if item and item.get("id"):
+                records.append((kind, item["id"], item))
+                ids.append(item["id"])
+            else:
+                ids.append(None)
+        meta = {k: v for k, v in part.items() if k != "items"}
+        containers[container] = {"meta": meta, "ids": ids}
+    return records, {"containers": containers}
+
+
+def _shape_refs(shape: Dict[str, Any]):
+    if "single" in shape:
+        yield shape["single"], [shape["id"]]
+    elif "list" in shape:
+        yield CONTAINER_KINDS[shape["list"]], shape["ids"]
+    else:
+        for container, part in shape["containers"].items():
+            yield CONTAINER_KINDS[container], part["ids"]
+
+
+class _transaction:
+    # BEGIN IMMEDIATE takes the write lock up front, so concurrent writers queue on busy_timeout
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+_catalog_store: Optional[CatalogStore] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog_store() -> Optional[CatalogStore]:
+    """
+    Process-wide store, or None when MOODFLOW_CATALOG_DB is set to an empty string.
+    """
+    global _catalog_store
+    if not str(os.environ.get("MOODFLOW_CATALOG_DB", CATALOG_PATH)):
+        return None
+    with _catalog_lock:
+        if _catalog_store is None:
+            _catalog_store = CatalogStore()
+        return _catalog_store
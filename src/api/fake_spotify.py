@@ -0,0 +1,517 @@
+"""
+Offline, deterministic stand-in for the Spotify Web API.
+
+Select it with MOODFLOW_SPOTIFY_BACKEND=fake; every client built through
+src.api.transport.make_spotify then talks to an in-process FakeSpotifyBackend
+instead of api.spotify.com, still through the scheduler and response caches.
+The catalog is generated from a seed (MOODFLOW_FAKE_SEED) and can be
+overridden per request with recorded responses (MOODFLOW_FAKE_FIXTURES).
+
+Latency and failures are configurable for benchmarks and load tests:
+
+    MOODFLOW_FAKE_LATENCY      seconds added to every call (default 0)
+    MOODFLOW_FAKE_JITTER       extra uniform random latency, seconds
+    MOODFLOW_FAKE_ERROR_RATE   probability of a 503
+    MOODFLOW_FAKE_429_RATE     probability of a 429
+    MOODFLOW_FAKE_RETRY_AFTER  Retry-After sent with 429s, seconds (default 1)
+    MOODFLOW_FAKE_MAX_RPS      answer 429 above this many requests per second
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import spotipy
+from spotipy.exceptions import SpotifyException
+
+from src.api.scheduler import ScheduledSpotify
+from src.api.spotify_genres import SPOTIFY_SEED_GENRES
+from src.recommender.genre_strategies import GENRE_SEED_ARTISTS, MOOD_BASED_GENRES
+
+API_PREFIX = "https://api.spotify.com/v1/"
+OPEN_URL = "https://open.spotify.com"
+
+ARTISTS_PER_GENRE = 8
+ALBUMS_PER_ARTIST = 2
+TRACKS_PER_ALBUM = 5
+PLAYLISTS_PER_GENRE = 4
+MAX_PLAYLIST_ITEMS_PER_REQUEST = 100
+
+_WORDS = sorted({
+    "midnight", "golden", "echo", "river", "neon", "summer", "static", "velvet",
+    "paper", "city", "ocean", "fire", "ghost", "silver", "wild", "blue",
+    "heart", "light", "dream", "road", "love", "night", "rain", "sky",
+} | {w for words in MOOD_BASED_GENRES.values() for w in words})
+
+_FIELD = re.compile(r'(\w+):("[^"]*"|\S+)')
+
+
+def _fake_id(*parts: Any) -> str:
+    # stable 22-character ids, like real Spotify base62 ids
+    return hashlib.blake2b(":".join(map(str, parts)).encode(), digest_size=11).hexdigest()
+
+
+def _image(kind: str, item_id: str) -> List[Dict[str, Any]]:
+    return [{"url": f"https://i.scdn.co/image/{kind}-{item_id}", "height": 640, "width": 640}]
+
+
+class FakeCatalog:
+    """
+    Generated artists, albums, tracks and playlists for every seed genre.
+    The curated seed artists of artist-focused genres are included by name.
+    """
+
+    def __init__(self, seed: int = 0):
+        rng = random.Random(seed)
+        self.artists: Dict[str, Dict[str, Any]] = {}
+        self.albums: Dict[str, Dict[str, Any]] = {}
+        self.tracks: Dict[str, Dict[str, Any]] = {}
+        self.playlists: List[Dict[str, Any]] = []
+        self.by_genre: Dict[str, List[str]] = {}
+
+        for genre in sorted(SPOTIFY_SEED_GENRES):
+            names = list(GENRE_SEED_ARTISTS.get(genre, []))
+            names += [f"{genre.title()} {rng.choice(_WORDS).title()} {i}" for i in range(ARTISTS_PER_GENRE - len(names))]
+            ids = []
+            for name in names:
+                artist_id = _fake_id(seed, "artist", name)
+                ids.append(artist_id)
+                if artist_id in self.artists:
+                    self.artists[artist_id]["genres"].append(genre)
+                    continue
+                self.artists[artist_id] = {
+                    "id": artist_id,
+                    "name": name,
+                    "type": "artist",
+                    "uri": f"spotify:artist:{artist_id}",
+                    "href": f"{API_PREFIX}artists/{artist_id}",
+                    "external_urls": {"spotify": f"{OPEN_URL}/artist/{artist_id}"},
+                    "genres": [genre],
+                    "popularity": rng.randint(20, 95),
+                    "followers": {"href": None, "total": rng.randint(1_000, 5_000_000)},
+                    "images": _image("artist", artist_id),
+                }
+                self._discography(rng, seed, artist_id)
+            self.by_genre[genre] = ids
+
+            for i in range(PLAYLISTS_PER_GENRE):
+                playlist_id = _fake_id(seed, "playlist", genre, i)
+                self.playlists.append({
+                    "id": playlist_id,
+                    "name": f"{genre.title()} {rng.choice(_WORDS).title()} Mix",
+                    "type": "playlist",
+                    "uri": f"spotify:playlist:{playlist_id}",
+                    "external_urls": {"spotify": f"{OPEN_URL}/playlist/{playlist_id}"},
+                    "images": _image("playlist", playlist_id),
+                    "owner": {"id": "spotify", "display_name": "Spotify"},
+                    "genre": genre,
+                })
+
+    def _discography(self, rng: random.Random, seed: int, artist_id: str) -> None:
+        artist = self.artists[artist_id]
+        ref = {k: artist[k] for k in ("id", "name", "type", "uri", "href", "external_urls")}
+        for a in range(ALBUMS_PER_ARTIST):
+            album_id = _fake_id(seed, "album", artist_id, a)
+            year = rng.randint(2012, 2024)
+            album = {
+                "id": album_id,
+                "name": f"{rng.choice(_WORDS).title()} {rng.choice(_WORDS).title()}",
+                "type": "album",
+                "album_type": "album",
+                "uri": f"spotify:album:{album_id}",
+                "external_urls": {"spotify": f"{OPEN_URL}/album/{album_id}"},
+                "artists": [ref],
+                "images": _image("album", album_id),
+                "release_date": f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "release_date_precision": "day",
+                "total_tracks": TRACKS_PER_ALBUM,
+            }
+            self.albums[album_id] = album
+            for t in range(TRACKS_PER_ALBUM):
+                track_id = _fake_id(seed, "track", album_id, t)
+                self.tracks[track_id] = {
+                    "id": track_id,
+                    "name": f"{rng.choice(_WORDS).title()} {rng.choice(_WORDS).title()}",
+                    "type": "track",
+                    "uri": f"spotify:track:{track_id}",
+                    "external_urls": {"spotify": f"{OPEN_URL}/track/{track_id}"},
+                    "artists": [ref],
+                    "album": album,
+                    "duration_ms": rng.randint(120_000, 320_000),
+                    "explicit": rng.random() < 0.2,
+                    "popularity": max(0, min(100, artist["popularity"] + rng.randint(-20, 10))),
+                    "preview_url": None,
+                    "track_number": t + 1,
+                }
+
+    # ---------------------------
+    # Search
+    # ---------------------------
+    def search(self, q: str, kind: str) -> List[Dict[str, Any]]:
+        fields = {k.lower(): v.strip('"') for k, v in _FIELD.findall(q)}
+        words = _FIELD.sub(" ", q).lower().split()
+        genre, artist, year = fields.get("genre"), fields.get("artist"), fields.get("year")
+
+        if kind == "playlist":
+            items = [p for p in self.playlists if not genre or p["genre"] == genre]
+            return [p for p in items if _matches(words, p["name"], p["genre"])]
+
+        artists = self.by_genre.get(genre, []) if genre else list(self.artists)
+        if artist:
+            artists = [a for a in artists if self.artists[a]["name"].lower() == artist.lower()]
+        if kind == "artist":
+            items = [self.artists[a] for a in artists if _matches(words, self.artists[a]["name"])]
+            return sorted(items, key=lambda a: -a["popularity"])
+
+        wanted = set(artists)
+        if kind == "album":
+            items = [a for a in self.albums.values() if a["artists"][0]["id"] in wanted]
+        else:
+            items = [t for t in self.tracks.values() if t["artists"][0]["id"] in wanted]
+
+        if year:
+            lo, _, hi = year.partition("-")
+            items = [i for i in items if lo <= _release(i)[:4] <= (hi or lo)]
+        items = [i for i in items if _matches(words, i["name"], i["artists"][0]["name"])]
+        return sorted(items, key=lambda i: (-i.get("popularity", 0), i["id"]))
+
+    def related(self, artist_id: str) -> List[Dict[str, Any]]:
+        genre = self.artists[artist_id]["genres"][0]
+        return [self.artists[a] for a in self.by_genre[genre] if a != artist_id]
+
+
+def _release(item: Dict[str, Any]) -> str:
+    return (item.get("album") or item).get("release_date", "")
+
+
+def _matches(words: List[str], *texts: str) -> bool:
+    haystack = " ".join(texts).lower()
+    return all(w in haystack for w in words)
+
+
+def _paging(url: str, items: List[Any], limit: int, offset: int) -> Dict[str, Any]:
+    page = items[offset:offset + limit]
+    more = offset + limit < len(items)
+    return {
+        "href": f"{API_PREFIX}{url}",
+        "items": page,
+        "limit": limit,
+        "offset": offset,
+        "total": len(items),
+        "next": f"{API_PREFIX}{url}?offset={offset + limit}&limit={limit}" if more else None,
+        "previous": None,
+    }
+
+
+def request_signature(method: str, url: str, params: Dict[str, Any]) -> str:
+    """
+    Fixture key: 'GET search?limit=10&q=genre:pop&type=track' (None params dropped, sorted).
+    """
+    query = "&".join(f"{k}={v}" for k, v in sorted(params.items()) if v is not None)
+    return f"{method} {url}" + (f"?{query}" if query else "")
+
+
+class FakeSpotifyBackend:
+    """
+    The in-process "server": routes spotipy REST calls to the generated
+    catalog, keeps user playlists in memory, and injects latency and errors.
+    Thread-safe; the random stream is seeded, so a single-threaded run
+    sees the same failures every time.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1.0,
+        max_rps: Optional[float] = None,
+        fixtures: Optional[Dict[str, Any]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.seed = seed
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.max_rps = max_rps
+        self.fixtures = dict(fixtures or {})
+        self._sleep = sleep
+
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._catalog: Optional[FakeCatalog] = None
+        self._recent: deque = deque()
+        self._injected: List[Tuple[int, float]] = []
+        self.user = {
+            "id": "fake-user",
+            "display_name": "Fake User",
+            "type": "user",
+            "uri": "spotify:user:fake-user",
+            "country": "US",
+            "product": "premium",
+        }
+        self.user_playlists: Dict[str, Dict[str, Any]] = {}
+        self.calls: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "FakeSpotifyBackend":
+        env = os.environ.get
+        fixtures = None
+        if env("MOODFLOW_FAKE_FIXTURES"):
+            with open(env("MOODFLOW_FAKE_FIXTURES")) as f:
+                fixtures = json.load(f)
+        max_rps = env("MOODFLOW_FAKE_MAX_RPS")
+        return cls(
+            seed=int(env("MOODFLOW_FAKE_SEED", "0")),
+            latency=float(env("MOODFLOW_FAKE_LATENCY", "0")),
+            jitter=float(env("MOODFLOW_FAKE_JITTER", "0")),
+            error_rate=float(env("MOODFLOW_FAKE_ERROR_RATE", "0")),
+            rate_limit_rate=float(env("MOODFLOW_FAKE_429_RATE", "0")),
+            retry_after=float(env("MOODFLOW_FAKE_RETRY_AFTER", "1")),
+            max_rps=float(max_rps) if max_rps else None,
+            fixtures=fixtures,
+        )
+
+    @property
+    def catalog(self) -> FakeCatalog:
+        with self._lock:
+            if self._catalog is None:
+                self._catalog = FakeCatalog(self.seed)
+            return self._catalog
+
+    def inject(self, status: int, count: int = 1, retry_after: Optional[float] = None) -> None:
+        """
+        Fail the next `count` requests with `status` (429s carry Retry-After).
+        """
+        with self._lock:
+            self._injected.extend([(status, self.retry_after if retry_after is None else retry_after)] * count)
+
+    def total_calls(self) -> int:
+        with self._lock:
+            return sum(self.calls.values())
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+    # ---------------------------
+    # Request handling
+    # ---------------------------
+    def handle(self, method: str, url: str, payload: Any, params: Dict[str, Any]) -> Any:
+        params = dict(params or {})
+        if url.startswith("http"):
+            parts = urlsplit(url)
+            url = parts.path.split("/v1/", 1)[-1]
+            params.update(parse_qsl(parts.query))
+        if "?" in url:
+            url, query = url.split("?", 1)
+            params.update(parse_qsl(query))
+        url = url.rstrip("/")
+
+        self._before(method, url)
+
+        signature = request_signature(method, url, params)
+        if signature in self.fixtures:
+            return self.fixtures[signature]
+        return self._route(method, url, payload, params)
+
+    def _before(self, method: str, url: str) -> None:
+        endpoint = f"{method} {_endpoint(url)}"
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            failure = self._injected.pop(0) if self._injected else None
+            if failure is None and self.max_rps:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] > 1.0:
+                    self._recent.popleft()
+                if len(self._recent) >= self.max_rps:
+                    failure = (429, self.retry_after)
+                else:
+                    self._recent.append(now)
+            if failure is None:
+                roll = self._rng.random()
+                if roll < self.rate_limit_rate:
+                    failure = (429, self.retry_after)
+                elif roll < self.rate_limit_rate + self.error_rate:
+                    failure = (503, 0.0)
+
+        if delay:
+            self._sleep(delay)
+        if failure is not None:
+            status, retry_after = failure
+            headers = {"Retry-After": str(retry_after)} if status == 429 else {}
+            message = "API rate limit exceeded" if status == 429 else "Service unavailable"
+            raise SpotifyException(status, -1, f"{API_PREFIX}{url}:\n {message}", headers=headers)
+
+    def _route(self, method: str, url: str, payload: Any, params: Dict[str, Any]) -> Any:
+        catalog = self.catalog
+        parts = url.split("/")
+        limit = int(params.get("limit") or 20)
+        offset = int(params.get("offset") or 0)
+
+        if method == "GET" and url == "search":
+            out = {}
+            for kind in str(params.get("type", "track")).split(","):
+                out[f"{kind}s"] = _paging(url, catalog.search(str(params.get("q", "")), kind), limit, offset)
+            return out
+
+        if method == "GET" and parts[0] in ("artists", "tracks", "albums"):
+            table = {"artists": catalog.artists, "tracks": catalog.tracks, "albums": catalog.albums}[parts[0]]
+            if len(parts) == 1:
+                return {parts[0]: [table.get(i) for i in str(params.get("ids", "")).split(",")]}
+            item = table.get(parts[1]) or _not_found(url)
+            if len(parts) == 2:
+                return item
+            if parts[0] == "artists" and parts[2] == "related-artists":
+                return {"artists": catalog.related(parts[1])}
+            if parts[0] == "artists" and parts[2] == "top-tracks":
+                return {"tracks": catalog.search(f'artist:"{item["name"]}"', "track")[:10]}
+
+        if method == "GET" and url == "audio-features":
+            return [self._audio_features(i) for i in str(params.get("ids", "")).split(",")]
+
+        if url == "me" and method == "GET":
+            return self.user
+        if method == "GET" and parts[0] == "users" and len(parts) == 2:
+            return self.user if parts[1] == self.user["id"] else {"id": parts[1], "type": "user"}
+        if method == "GET" and url == "me/playlists":
+            return _paging(url, list(self.user_playlists.values()), limit, offset)
+
+        if method == "POST" and (url == "me/playlists" or (parts[0] == "users" and parts[-1] == "playlists")):
+            return self._create_playlist(payload or {})
+
+        if parts[0] == "playlists" and len(parts) >= 2:
+            return self._playlist_call(method, parts, payload, params, limit, offset)
+
+        raise SpotifyException(404, -1, f"{API_PREFIX}{url}:\n Service not found (fake backend)")
+
+    # ---------------------------
+    # Playlists
+    # ---------------------------
+    def _create_playlist(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            playlist_id = _fake_id(self.seed, "user-playlist", len(self.user_playlists))
+            playlist = {
+                "id": playlist_id,
+                "name": data.get("name", ""),
+                "description": data.get("description", ""),
+                "public": data.get("public", True),
+                "collaborative": data.get("collaborative", False),
+                "type": "playlist",
+                "uri": f"spotify:playlist:{playlist_id}",
+                "external_urls": {"spotify": f"{OPEN_URL}/playlist/{playlist_id}"},
+                "owner": {"id": self.user["id"], "display_name": self.user["display_name"]},
+                "snapshot_id": "0",
+                "items": [],
+            }
+            self.user_playlists[playlist_id] = playlist
+            return _public_playlist(playlist)
+
+    def _playlist_call(self, method: str, parts: List[str], payload: Any, params: Dict[str, Any], limit: int, offset: int) -> Any:
+        url = "/".join(parts)
+        playlist = self.user_playlists.get(parts[1])
+        if playlist is None:
+            return _not_found(url)
+        sub = parts[2] if len(parts) > 2 else ""
+
+        with self._lock:
+            if method == "GET" and not sub:
+                return _public_playlist(playlist)
+            if method == "PUT" and not sub:
+                playlist.update({k: v for k, v in (payload or {}).items() if k in ("name", "public", "collaborative", "description")})
+                return None
+            if sub in ("items", "tracks"):
+                if method == "GET":
+                    return _paging(url, [{"track": self._track_for(u)} for u in playlist["items"]], limit, offset)
+                uris = payload.get("uris", []) if isinstance(payload, dict) else list(payload or [])
+                if len(uris) > MAX_PLAYLIST_ITEMS_PER_REQUEST:
+                    raise SpotifyException(400, -1, f"{API_PREFIX}{url}:\n You can add a maximum of 100 tracks per request.")
+                if method == "POST":
+                    position = params.get("position")
+                    at = len(playlist["items"]) if position is None else int(position)
+                    playlist["items"][at:at] = uris
+                elif method == "PUT":
+                    playlist["items"] = uris
+                playlist["snapshot_id"] = str(int(playlist["snapshot_id"]) + 1)
+                return {"snapshot_id": playlist["snapshot_id"]}
+            if method == "DELETE" and sub == "followers":
+                del self.user_playlists[parts[1]]
+                return None
+        return _not_found(url)
+
+    def _track_for(self, uri: str) -> Optional[Dict[str, Any]]:
+        return self.catalog.tracks.get(uri.rsplit(":", 1)[-1].rsplit("/", 1)[-1])
+
+    def _audio_features(self, track_id: str) -> Optional[Dict[str, Any]]:
+        if track_id not in self.catalog.tracks:
+            return None
+        rng = random.Random(f"{self.seed}:{track_id}")
+        return {
+            "id": track_id,
+            "danceability": round(rng.random(), 3),
+            "energy": round(rng.random(), 3),
+            "valence": round(rng.random(), 3),
+            "tempo": round(rng.uniform(60, 180), 3),
+        }
+
+
+def _endpoint(url: str) -> str:
+    # "artists/<id>/related-artists" -> "artists/{id}/related-artists", for call counters
+    parts = url.split("/")
+    return "/".join("{id}" if i % 2 == 1 and parts[0] in ("artists", "tracks", "albums", "playlists", "users") else p
+                    for i, p in enumerate(parts))
+
+
+def _public_playlist(playlist: Dict[str, Any]) -> Dict[str, Any]:
+    out = {k: v for k, v in playlist.items() if k != "items"}
+    out["tracks"] = {"href": f"{API_PREFIX}playlists/{playlist['id']}/items", "total": len(playlist["items"])}
+    return out
+
+
+def _not_found(url: str) -> Any:
+    raise SpotifyException(404, -1, f"{API_PREFIX}{url}:\n Resource not found")
+
+
+class FakeSpotify(spotipy.Spotify):
+    """
+    spotipy.Spotify answered by a FakeSpotifyBackend instead of HTTP.
+    Every public spotipy method works unchanged; auth is never used.
+    """
+
+    def __init__(self, *args, backend: Optional[FakeSpotifyBackend] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.backend = backend or get_fake_backend()
+
+    def _internal_call(self, method, url, payload, params):
+        return self.backend.handle(method, url, payload, params)
+
+
+class ScheduledFakeSpotify(ScheduledSpotify, FakeSpotify):
+    """
+    FakeSpotify paced by a RequestScheduler, so injected 429s and 5xx
+    errors exercise the same retry path as the real API.
+    """
+
+
+_fake_backend: Optional[FakeSpotifyBackend] = None
+_fake_backend_lock = threading.Lock()
+
+
+def get_fake_backend() -> FakeSpotifyBackend:
+    # shared by every client in the process, so playlists written by one are seen by all
+    global _fake_backend
+    with _fake_backend_lock:
+        if _fake_backend is None:
+            _fake_backend = FakeSpotifyBackend.from_env()
+        return _fake_backend
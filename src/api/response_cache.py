@@ -0,0 +1,276 @@
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import spotipy
+
+from src.api.scheduler import BACKGROUND, request_priority
+
+# seconds a cached response stays fresh, per spotipy endpoint
+ENDPOINT_TTLS: Dict[str, float] = {
+    "search": 6 * 3600,
+    "artist": 24 * 3600,
+    "track": 24 * 3600,
+    "artist_related_artists": 24 * 3600,
+}
+
+# endpoints whose first argument is a Spotify ID / URI / URL
+ID_ENDPOINTS = {"artist", "track", "artist_related_artists"}
+
+_SIGNATURES = {name: inspect.signature(getattr(spotipy.Spotify, name)) for name in ENDPOINT_TTLS}
+
+
+def normalize_spotify_id(value: str) -> str:
+    # "spotify:artist:ID", "https://open.spotify.com/artist/ID?si=..." and "ID" are the same artist
+    value = str(value).strip()
+    if "open.spotify.com" in value:
+        return value.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1]
+    if value.startswith("spotify:"):
+        return value.rsplit(":", 1)[-1]
+    return value
+
+
+def request_key(endpoint: str, args: Tuple, kwargs: Dict[str, Any]) -> Tuple[Hashable, ...]:
+    """
+    Canonical cache key for a spotipy call. Arguments are bound to the method
+    signature with defaults applied, so search(q, type="track") and
+    search(q=q, limit=10, type="track") share a key, while differing
+    market / limit / offset / type values never collide.
+    """
+    bound = _SIGNATURES[endpoint].bind(None, *args, **kwargs)
+    bound.apply_defaults()
+    params = dict(bound.arguments)
+    params.pop("self", None)
+
+    if endpoint in ID_ENDPOINTS:
+        first = next(iter(params))
+        params[first] = normalize_spotify_id(params[first])
+
+    return (endpoint,) + tuple(sorted((k, _freeze(v)) for k, v in params.items()))
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+class ResponseCache:
+    """
+    Process-wide TTL + LRU cache of Spotify responses.
+    Entries expire per endpoint (ENDPOINT_TTLS); the least recently used
+    entry is dropped once max_entries is reached. Cached responses are
+    shared between callers and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        ttls: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttls = dict(ENDPOINT_TTLS if ttls is None else ttls)
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        endpoint = key[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits[endpoint] = self.hits.get(endpoint, 0) + 1
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses[endpoint] = self.misses.get(endpoint, 0) + 1
+            return False, None
+
+    def put(self, key: Tuple, value: Any) -> None:
+        ttl = self.ttls.get(key[0])
+        if not ttl or value is None:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits.clear()
+            self.misses.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+            }
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one: the first caller
+    runs fn, everyone arriving while it is in flight waits for and shares
+    its result (or its exception). Nothing is kept once the call finishes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            fut = self._calls.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._calls[key] = Future()
+            else:
+                self.shared += 1
+
+        if not leader:
+            return fut.result()
+
+        try:
+            value = fn()
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class CachedSpotify:
+    """
+    Drop-in wrapper around spotipy.Spotify that serves the metadata endpoints
+    in ENDPOINT_TTLS from a ResponseCache. Every other attribute is forwarded.
+
+    With a CatalogStore attached, memory misses fall through to disk. A stale
+    disk entry is returned immediately and refreshed in the background.
+    Concurrent misses for the same request share one lookup (SingleFlight).
+    """
+
+    def __init__(
+        self,
+        sp: spotipy.Spotify,
+        cache: Optional[ResponseCache] = None,
+        store=None,
+        flights: Optional[SingleFlight] = None,
+    ):
+        self._sp = sp
+        self._cache = cache or get_response_cache()
+        self._store = store
+        self._flights = flights or get_single_flight()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._sp, name)
+
+    def _call(self, endpoint: str, *args, **kwargs) -> Any:
+        key = request_key(endpoint, args, kwargs)
+        hit, value = self._cache.get(key)
+        if hit:
+            return value
+        return self._flights.do(key, lambda: self._load(endpoint, args, kwargs, key))
+
+    def _load(self, endpoint: str, args: Tuple, kwargs: Dict[str, Any], key: Tuple) -> Any:
+        if self._store is not None:
+            stored = self._stored(key)
+            if stored is not None:
+                value, fresh = stored
+                self._cache.put(key, value)
+                if not fresh and self._store.claim_refresh(store_key(key)):
+                    _refresh_pool().submit(self._refresh, endpoint, args, kwargs, key)
+                return value
+
+        return self._fetch(endpoint, args, kwargs, key)
+
+    def _fetch(self, endpoint: str, args: Tuple, kwargs: Dict[str, Any], key: Tuple) -> Any:
+        value = getattr(self._sp, endpoint)(*args, **kwargs)
+        self._cache.put(key, value)
+        if self._store is not None and value is not None:
+            try:
+                self._store.put(store_key(key), endpoint, value)
+            except Exception as e:
+                print(f"Could not persist Spotify response: {e}")
+        return value
+
+    def _stored(self, key: Tuple) -> Optional[Tuple[Any, bool]]:
+        try:
+            return self._store.get(store_key(key))
+        except Exception as e:
+            print(f"Spotify catalog store unavailable: {e}")
+            return None
+
+    def _refresh(self, endpoint: str, args: Tuple, kwargs: Dict[str, Any], key: Tuple) -> None:
+        try:
+            with request_priority(BACKGROUND):
+                self._fetch(endpoint, args, kwargs, key)
+        except Exception as e:
+            print(f"Background refresh of {endpoint} failed: {e}")
+
+    def search(self, *args, **kwargs):
+        return self._call("search", *args, **kwargs)
+
+    def artist(self, *args, **kwargs):
+        return self._call("artist", *args, **kwargs)
+
+    def track(self, *args, **kwargs):
+        return self._call("track", *args, **kwargs)
+
+    def artist_related_artists(self, *args, **kwargs):
+        return self._call("artist_related_artists", *args, **kwargs)
+
+
+def store_key(key: Tuple) -> str:
+    return json.dumps(key)
+
+
+_refresh_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _refresh_pool() -> ThreadPoolExecutor:
+    global _refresh_executor
+    with _response_cache_lock:
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="spotify-refresh")
+        return _refresh_executor
+
+
+_response_cache: Optional[ResponseCache] = None
+_single_flight: Optional[SingleFlight] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    # shared by every client and Streamlit session in this process
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
+
+
+def get_single_flight() -> SingleFlight:
+    global _single_flight
+    with _response_cache_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight()
+        return _single_flight
@@ -0,0 +1,236 @@
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import spotipy
+from requests.adapters import HTTPAdapter
+from spotipy.exceptions import SpotifyException
+from urllib3.util.retry import Retry
+
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# sustained requests per second and burst size, per credential
+DEFAULT_RATE = float(os.environ.get("MOODFLOW_SPOTIFY_RATE", "10"))
+DEFAULT_BURST = float(os.environ.get("MOODFLOW_SPOTIFY_BURST", "20"))
+
+# callers give up instead of queueing longer than this (e.g. a Retry-After of hours)
+DEFAULT_MAX_WAIT = 30.0
+
+TRANSIENT_STATUSES = {500, 502, 503, 504}
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("spotify_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: int):
+    """
+    Run the enclosed Spotify calls at the given priority (BACKGROUND for cache refreshes).
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class RateLimited(SpotifyException):
+    """Raised when a call would have to wait longer than the scheduler's max_wait."""
+
+    def __init__(self, wait: float):
+        super().__init__(429, -1, f"Spotify rate limit: would wait {wait:.1f}s")
+        self.wait = wait
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """
+        Take one token; returns 0 on success, else seconds until one is available.
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RequestScheduler:
+    """
+    Central gate for every Spotify HTTP request in the process.
+
+    - one token bucket per credential (Spotify limits per app)
+    - a 429 pauses every caller on that credential for Retry-After seconds,
+      then the call is retried; 5xx responses are retried with backoff
+    - BACKGROUND callers only proceed while no INTERACTIVE caller is queued
+    - stats() exposes queue depth, throttle time and retry counters
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: float = DEFAULT_BURST,
+        max_retries: int = 3,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        backoff: float = 0.3,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self.backoff = backoff
+        self._clock = clock
+
+        self._cond = threading.Condition()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._blocked_until: Dict[str, float] = {}
+        self._waiting: Dict[Tuple[str, int], int] = {}
+
+        self._stats: Dict[str, float] = {
+            "calls": 0, "throttled_calls": 0, "throttle_seconds": 0.0,
+            "rate_limited": 0, "retries": 0, "rejected": 0,
+        }
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+    def call(self, credential: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        priority = _priority.get()
+        for attempt in range(self.max_retries + 1):
+            self._acquire(credential, priority)
+            try:
+                return fn(*args, **kwargs)
+            except SpotifyException as e:
+                if attempt == self.max_retries:
+                    raise
+                if e.http_status == 429:
+                    self._block(credential, _retry_after(e))
+                elif e.http_status in TRANSIENT_STATUSES:
+                    time.sleep(self.backoff * (2 ** attempt))
+                else:
+                    raise
+                with self._cond:
+                    self._stats["retries"] += 1
+
+    def queue_depth(self) -> Dict[str, int]:
+        with self._cond:
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for (_, priority), n in self._waiting.items():
+                depth[PRIORITY_NAMES[priority]] += n
+            return depth
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats["queue_depth"] = self.queue_depth()
+        return stats
+
+    # ---------------------------
+    # Internals
+    # ---------------------------
+    def _block(self, credential: str, seconds: float) -> None:
+        with self._cond:
+            until = self._clock() + seconds
+            self._blocked_until[credential] = max(self._blocked_until.get(credential, 0.0), until)
+            self._stats["rate_limited"] += 1
+            self._cond.notify_all()
+
+    def _acquire(self, credential: str, priority: int) -> None:
+        start = self._clock()
+        slot = (credential, priority)
+        with self._cond:
+            self._waiting[slot] = self._waiting.get(slot, 0) + 1
+            try:
+                while True:
+                    now = self._clock()
+                    wait = self._blocked_until.get(credential, 0.0) - now
+                    if wait <= 0 and priority == BACKGROUND and self._waiting.get((credential, INTERACTIVE)):
+                        # yield to interactive callers; woken when they get through
+                        wait = 0.05
+                    elif wait <= 0:
+                        bucket = self._buckets.get(credential)
+                        if bucket is None:
+                            bucket = self._buckets[credential] = TokenBucket(self.rate, self.burst, now)
+                        wait = bucket.take(now)
+                        if wait == 0:
+                            break
+
+                    if now + wait - start > self.max_wait:
+                        self._stats["rejected"] += 1
+                        raise RateLimited(now + wait - start)
+                    self._cond.wait(wait)
+            finally:
+                self._waiting[slot] -= 1
+                self._cond.notify_all()
+
+            waited = self._clock() - start
+            self._stats["calls"] += 1
+            if waited > 0.001:
+                self._stats["throttled_calls"] += 1
+                self._stats["throttle_seconds"] += waited
+
+
+def _retry_after(e: SpotifyException) -> float:
+    headers = getattr(e, "headers", None) or {}
+    try:
+        return max(0.0, float(headers.get("Retry-After", 1)))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class ScheduledSpotify(spotipy.Spotify):
+    """
+    spotipy.Spotify whose every HTTP request goes through a RequestScheduler.
+    urllib3's own status retries are switched off so 429 / 5xx responses
+    reach the scheduler (with their Retry-After header) instead of sleeping
+    invisibly inside one thread.
+    """
+
+    def __init__(self, *args, scheduler: Optional[RequestScheduler] = None, credential: str = "default", **kwargs):
+        super().__init__(*args, **kwargs)
+        self._scheduler = scheduler or get_scheduler()
+        self._credential = credential
+
+        session = getattr(self, "_session", None)
+        if session is not None and hasattr(session, "mount"):
+            retry = Retry(
+                total=self.retries,
+                connect=None,
+                read=False,
+                status=0,
+                status_forcelist=(),
+                respect_retry_after_header=False,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(max_retries=retry)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+
+    def _internal_call(self, method, url, payload, params):
+        return self._scheduler.call(
+            self._credential, super()._internal_call, method, url, payload, params
+        )
+
+
+_scheduler: Optional[RequestScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> RequestScheduler:
+    # one scheduler per process, so every session shares the rate budget
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
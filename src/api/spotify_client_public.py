@@ -1,8 +1,7 @@
-import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
 from typing import List, Dict
 
-from src.secrets.spotify_keys import CLIENT_ID, CLIENT_SECRET
+from src.api.transport import make_spotify, spotify_credentials
 
 
 class SpotifyClientPublic:
@@ -13,11 +12,12 @@ class SpotifyClientPublic:
     """
 
     def __init__(self):
+        client_id, client_secret = spotify_credentials()
         auth = SpotifyClientCredentials(
-            client_id=CLIENT_ID,
-            client_secret=CLIENT_SECRET
+            client_id=client_id,
+            client_secret=client_secret
         )
-        self.sp = spotipy.Spotify(auth_manager=auth)
+        self.sp = make_spotify(auth)
 
     # ---------------------------
     # Artists by genre
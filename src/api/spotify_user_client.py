@@ -1,16 +1,22 @@
-import spotipy
+from concurrent.futures import Future, ThreadPoolExecutor
 from spotipy.oauth2 import SpotifyOAuth
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
-from src.secrets.spotify_keys import CLIENT_ID, CLIENT_SECRET
+from src.api.transport import make_spotify, spotify_credentials
+
+
+# independent Spotify searches in flight at once, per recommend_tracks call
+DEFAULT_MAX_CONCURRENCY = 8
 
 
 class SpotifyUserClient:
-    def __init__(self):
-        self.sp = spotipy.Spotify(
-            auth_manager=SpotifyOAuth(
-                client_id=CLIENT_ID,
-                client_secret=CLIENT_SECRET,
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        client_id, client_secret = spotify_credentials()
+        self.sp = make_spotify(
+            SpotifyOAuth(
+                client_id=client_id,
+                client_secret=client_secret,
                 redirect_uri="http://127.0.0.1:8888/callback",
                 scope=(
                     "user-read-private user-read-email "
@@ -18,7 +24,7 @@ class SpotifyUserClient:
                     "user-library-read"  # This allows reading audio features!
                 )
             )
-        )   
+        )
 
     # ---------------------------
     # User info
@@ -29,178 +35,170 @@ class SpotifyUserClient:
             raise RuntimeError("Spotify user not authenticated")
         return user
 
+    # ---------------------------
+    # Concurrent search helpers
+    # ---------------------------
+    def _pool(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="spotify")
+
+    def _search_tracks(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        results = self.sp.search(q=query, type='track', limit=limit, market='US')
+        if results and 'tracks' in results:
+            return results['tracks']['items']
+        return []
+
+    def _related_artist_names(self, artist_name: str) -> List[str]:
+        artist_results = self.sp.search(q=f"artist:{artist_name}", type='artist', limit=1, market='US')
+        if artist_results and 'artists' in artist_results and artist_results['artists']['items']:
+            artist_id = artist_results['artists']['items'][0]['id']
+            related = self.sp.artist_related_artists(artist_id)
+            if related and 'artists' in related:
+                return [a['name'] for a in related['artists']]
+        return []
+
+    @staticmethod
+    def _collect(futures: List[Future]) -> List[Dict[str, Any]]:
+        """
+        Concatenate track lists in submission order (not completion order),
+        so the merged result is deterministic. Failed searches are skipped.
+        """
+        tracks: List[Dict[str, Any]] = []
+        for fut in futures:
+            try:
+                tracks.extend(fut.result())
+            except Exception as e:
+                print(f"Spotify search failed: {e}")
+        return tracks
+
     # ---------------------------
     # Recommendations
     # ---------------------------
     def recommend_tracks(self, seed_genres=None, seed_artists=None, seed_tracks=None, limit=25, target=None):
         """
-        Get track recommendations using genre-specific search strategies
+        Get track recommendations using genre-specific search strategies.
+        Independent searches run concurrently (at most max_concurrency at a time).
         """
-        from src.recommender.genre_strategies import get_search_strategy, GENRE_SEED_ARTISTS
-        
+        with self._pool() as pool:
+            return self._recommend_tracks(pool, seed_genres, seed_tracks, limit)
+
+    def _recommend_tracks(self, pool: ThreadPoolExecutor, seed_genres, seed_tracks, limit):
+        from src.recommender.genre_strategies import get_search_strategy
+
         # Get seed track info if provided
         seed_features = None
         artist_name = None
         genre_to_search = None
-        
+
+        # related artists of the seed artist take two sequential calls; they are
+        # started as soon as the artist is known so they overlap everything after
+        related_future: Optional[Future] = None
+
         if seed_tracks:
+            feats_future = pool.submit(self.sp.audio_features, [seed_tracks[0]])
+            track_future = pool.submit(self.sp.track, seed_tracks[0])
+
             try:
-                feats = self.sp.audio_features([seed_tracks[0]])
+                feats = feats_future.result()
                 if feats and len(feats) > 0:
                     seed_features = feats[0]
-            except:
-                pass
-            
+            except Exception as e:
+                print(f"Could not get seed audio features: {e}")
+
             try:
-                track = self.sp.track(seed_tracks[0])
+                track = track_future.result()
                 if track and 'artists' in track and track['artists']:
                     artist_id = track['artists'][0]['id']
                     artist_name = track['artists'][0]['name']
-                    
+                    related_future = pool.submit(self._related_artist_names, artist_name)
+
                     artist = self.sp.artist(artist_id)
                     if artist and 'genres' in artist and artist['genres']:
                         genre_to_search = artist['genres'][0]
                         print(f"Found artist: {artist_name}, genre: {genre_to_search}")
             except Exception as e:
                 print(f"Error getting seed track info: {e}")
-        
+
         if not genre_to_search and seed_genres:
             genre_to_search = seed_genres[0] if isinstance(seed_genres, list) else seed_genres
-        
+
         if not genre_to_search:
             genre_to_search = "pop"
-        
+
         # Get the search strategy for this genre
         strategy = get_search_strategy(genre_to_search)
         print(f"Using strategy for '{genre_to_search}': {strategy}")
-        
+
+        max_related = strategy["max_related_artists"] if strategy["use_artist_search"] else 5
+
+        def related_names() -> List[str]:
+            if related_future is None:
+                return []
+            try:
+                return related_future.result()[:max_related]
+            except Exception as e:
+                print(f"Could not get related artists: {e}")
+                return []
+
         try:
-            all_tracks = []
-            
+            searches: List[Future] = []
+
             # Strategy 1: Artist-focused search (K-pop, J-pop, Latin, etc.)
             if strategy["use_artist_search"]:
                 print(f"Using artist-focused search for {genre_to_search}")
-                
+
                 # Use seed artists from our curated list
                 artists_to_search = []
-                
+
                 # If we have the actual artist from the uploaded song, prioritize them
                 if artist_name:
                     artists_to_search.append(artist_name)
-                    
                     # Get related artists for variety
-                    try:
-                        artist_results = self.sp.search(q=f"artist:{artist_name}", type='artist', limit=1, market='US')
-                        if artist_results and 'artists' in artist_results and artist_results['artists']['items']:
-                            artist_id = artist_results['artists']['items'][0]['id']
-                            related = self.sp.artist_related_artists(artist_id)
-                            if related and 'artists' in related:
-                                artists_to_search.extend([a['name'] for a in related['artists'][:strategy["max_related_artists"]]])
-                    except:
-                        pass
-                
+                    artists_to_search.extend(related_names())
+
                 # Fall back to curated seed artists for this genre
                 if len(artists_to_search) < 5:
                     artists_to_search.extend(strategy["seed_artists"][:10])
-                
+
                 # Search tracks by these artists (recent only)
                 for artist in artists_to_search[:15]:  # Limit to avoid too many requests
-                    try:
-                        if strategy["use_year_filter"]:
-                            query = f'artist:"{artist}" year:2023-2024'
-                        else:
-                            query = f'artist:"{artist}"'
-                        
-                        results = self.sp.search(q=query, type='track', limit=5, market='US')
-                        if results and 'tracks' in results:
-                            all_tracks.extend(results['tracks']['items'])
-                    except:
-                        continue
-            
+                    if strategy["use_year_filter"]:
+                        query = f'artist:"{artist}" year:2023-2024'
+                    else:
+                        query = f'artist:"{artist}"'
+                    searches.append(pool.submit(self._search_tracks, query, 5))
+
             # Strategy 2: Genre-based search with year filtering
             elif strategy["use_year_filter"]:
                 print(f"Using time-sensitive search for {genre_to_search}")
-                
+
                 for year in [2024, 2023]:
-                    results = self.sp.search(
-                        q=f"genre:{genre_to_search} year:{year}",
-                        type='track',
-                        limit=25,
-                        market='US'
-                    )
-                    if results and 'tracks' in results:
-                        all_tracks.extend(results['tracks']['items'])
-                
+                    searches.append(pool.submit(self._search_tracks, f"genre:{genre_to_search} year:{year}", 25))
+
                 # Also get related artists if we have seed track
-                if artist_name:
-                    try:
-                        artist_results = self.sp.search(q=f"artist:{artist_name}", type='artist', limit=1, market='US')
-                        if artist_results and 'artists' in artist_results and artist_results['artists']['items']:
-                            artist_id = artist_results['artists']['items'][0]['id']
-                            related = self.sp.artist_related_artists(artist_id)
-                            if related and 'artists' in related:
-                                for rel_artist in related['artists'][:5]:
-                                    rel_results = self.sp.search(
-                                        q=f'artist:"{rel_artist["name"]}" year:2023-2024',
-                                        type='track',
-                                        limit=5,
-                                        market='US'
-                                    )
-                                    if rel_results and 'tracks' in rel_results:
-                                        all_tracks.extend(rel_results['tracks']['items'])
-                    except:
-                        pass
-            
+                for rel_artist in related_names():
+                    searches.append(pool.submit(self._search_tracks, f'artist:"{rel_artist}" year:2023-2024', 5))
+
             # Strategy 3: Standard genre search (classical, jazz, blues, etc.)
             else:
                 print(f"Using standard genre search for {genre_to_search}")
-                
+
                 # Add mood keywords if available
-                if strategy["mood_keywords"]:
-                    for keyword in strategy["mood_keywords"]:
-                        results = self.sp.search(
-                            q=f"genre:{genre_to_search} {keyword}",
-                            type='track',
-                            limit=15,
-                            market='US'
-                        )
-                        if results and 'tracks' in results:
-                            all_tracks.extend(results['tracks']['items'])
-                
+                for keyword in strategy["mood_keywords"]:
+                    searches.append(pool.submit(self._search_tracks, f"genre:{genre_to_search} {keyword}", 15))
+
                 # Standard genre search
-                results = self.sp.search(
-                    q=f"genre:{genre_to_search}",
-                    type='track',
-                    limit=30,
-                    market='US'
-                )
-                if results and 'tracks' in results:
-                    all_tracks.extend(results['tracks']['items'])
-                
+                searches.append(pool.submit(self._search_tracks, f"genre:{genre_to_search}", 30))
+
                 # Related artists if available
-                if artist_name:
-                    try:
-                        artist_results = self.sp.search(q=f"artist:{artist_name}", type='artist', limit=1, market='US')
-                        if artist_results and 'artists' in artist_results and artist_results['artists']['items']:
-                            artist_id = artist_results['artists']['items'][0]['id']
-                            related = self.sp.artist_related_artists(artist_id)
-                            if related and 'artists' in related:
-                                for rel_artist in related['artists'][:5]:
-                                    rel_results = self.sp.search(
-                                        q=f'artist:"{rel_artist["name"]}"',
-                                        type='track',
-                                        limit=5,
-                                        market='US'
-                                    )
-                                    if rel_results and 'tracks' in rel_results:
-                                        all_tracks.extend(rel_results['tracks']['items'])
-                    except:
-                        pass
-            
+                for rel_artist in related_names():
+                    searches.append(pool.submit(self._search_tracks, f'artist:"{rel_artist}"', 5))
+
+            all_tracks = self._collect(searches)
+
             if not all_tracks:
                 print(f"No search results")
                 return []
-            
+
             # Remove duplicates
             seen_ids = set()
             tracks = []
@@ -208,21 +206,21 @@ class SpotifyUserClient:
                 if t and t.get('id') and t['id'] not in seen_ids:
                     seen_ids.add(t['id'])
                     tracks.append(t)
-            
+
             # Remove the seed track itself
             if seed_tracks:
                 tracks = [t for t in tracks if t.get('id') != seed_tracks[0]]
-            
+
             # Sort by popularity and recency
             tracks.sort(key=lambda x: (
                 x.get('album', {}).get('release_date', '2000').startswith(('2024', '2023')),  # Recent first
                 x.get('popularity', 0)  # Then by popularity
             ), reverse=True)
-            
+
             result_tracks = tracks[:limit]
             print(f"Returning {len(result_tracks)} tracks")
             return result_tracks
-            
+
         except Exception as e:
             print(f"Spotify Search API error: {e}")
             import traceback
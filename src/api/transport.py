@@ -0,0 +1,61 @@
+import os
+from typing import Tuple
+
+from src.api.catalog_store import get_catalog_store
+from src.api.response_cache import CachedSpotify
+from src.api.scheduler import ScheduledSpotify, get_scheduler
+
+# "spotify" (the Web API) or "fake" (src.api.fake_spotify, offline and deterministic)
+BACKENDS = ("spotify", "fake")
+
+FAKE_CREDENTIALS = ("fake-client-id", "fake-client-secret")
+
+
+def spotify_backend() -> str:
+    backend = os.environ.get("MOODFLOW_SPOTIFY_BACKEND", "spotify").strip().lower() or "spotify"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown MOODFLOW_SPOTIFY_BACKEND {backend!r}, expected one of {BACKENDS}")
+    return backend
+
+
+def spotify_credentials() -> Tuple[str, str]:
+    """
+    App client ID and secret: SPOTIFY_CLIENT_ID / SPOTIFY_CLIENT_SECRET if set,
+    otherwise src/secrets/spotify_keys.py. The fake backend needs neither.
+    """
+    client_id = os.environ.get("SPOTIFY_CLIENT_ID")
+    client_secret = os.environ.get("SPOTIFY_CLIENT_SECRET")
+    if client_id and client_secret:
+        return client_id, client_secret
+    try:
+        from src.secrets.spotify_keys import CLIENT_ID, CLIENT_SECRET
+        return CLIENT_ID, CLIENT_SECRET
+    except ImportError:
+        if spotify_backend() == "fake":
+            return FAKE_CREDENTIALS
+        raise RuntimeError(
+            "No Spotify credentials: set SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET, "
+            "create src/secrets/spotify_keys.py, or use MOODFLOW_SPOTIFY_BACKEND=fake"
+        )
+
+
+def make_spotify(auth_manager) -> CachedSpotify:
+    """
+    The spotipy client every MoodFlow Spotify client talks through:
+    metadata calls are served from the shared in-memory response cache,
+    backed by the on-disk catalog store (disable with MOODFLOW_CATALOG_DB="").
+    Every request that does reach Spotify is paced by the process-wide
+    RequestScheduler, keyed by the app's client ID.
+
+    With MOODFLOW_SPOTIFY_BACKEND=fake the requests are answered by the
+    shared in-process FakeSpotifyBackend instead; auth is never used.
+    """
+    credential = getattr(auth_manager, "client_id", None) or "default"
+    if spotify_backend() == "fake":
+        from src.api.fake_spotify import ScheduledFakeSpotify, get_fake_backend
+        sp = ScheduledFakeSpotify(
+            auth_manager=auth_manager, scheduler=get_scheduler(), credential=credential, backend=get_fake_backend()
+        )
+    else:
+        sp = ScheduledSpotify(auth_manager=auth_manager, scheduler=get_scheduler(), credential=credential)
+    return CachedSpotify(sp, store=get_catalog_store())
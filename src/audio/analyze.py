@@ -1,10 +1,91 @@
-from typing import Dict, IO, Union
+import time
+from pathlib import Path
+from typing import Any, Dict, IO, Iterator, Optional, Union
 from src.audio.loader import load_audio
-from src.audio.features import extract_features
+from src.audio.features import extract_features, extract_excerpt_features, feature_drift, FEATURE_VERSION
+from src.audio.cache import AnalysisCache, content_key, get_analysis_cache
 
 AudioInput = Union[str, IO[bytes]]
 
-def analyze_audio(inp: AudioInput) -> Dict[str, float]:
-    #one call audio analysis for the app
-    y, sr = load_audio(inp)
+READ_CHUNK = 1 << 20
+
+
+def iter_audio_bytes(inp: AudioInput) -> Iterator[bytes]:
+    """
+    Raw bytes of a file path or file-like upload, in chunks.
+    The stream position of a file-like input is restored afterwards.
+    """
+    if isinstance(inp, (str, Path)):
+        with open(inp, "rb") as f:
+            while chunk := f.read(READ_CHUNK):
+                yield chunk
+        return
+
+    if hasattr(inp, "getbuffer"):
+        yield inp.getbuffer()
+        return
+
+    pos = inp.tell()
+    try:
+        while chunk := inp.read(READ_CHUNK):
+            yield chunk
+    finally:
+        inp.seek(pos)
+
+
+def analysis_config(mode: str = "full") -> str:
+    return f"features-v{FEATURE_VERSION}:{mode}"
+
+
+def _analyze(inp: AudioInput, mode: str) -> Dict[str, float]:
+    y, sr = load_audio(inp, mode=mode)
+    if mode == "excerpt":
+        return extract_excerpt_features(y, sr)
     return extract_features(y, sr)
+
+
+def analyze_audio(
+    inp: AudioInput,
+    mode: str = "full",
+    use_cache: bool = True,
+    cache: Optional[AnalysisCache] = None,
+) -> Dict[str, float]:
+    #one call audio analysis for the app
+    # mode="stream" keeps memory flat for very long uploads,
+    # mode="excerpt" caps the work per file (see load_audio)
+    if not use_cache:
+        return _analyze(inp, mode)
+
+    cache = cache or get_analysis_cache()
+    key = content_key(iter_audio_bytes(inp), analysis_config(mode))
+
+    feats = cache.get(key)
+    if feats is not None:
+        return feats
+
+    feats = _analyze(inp, mode)
+    cache.put(key, feats)
+    return feats
+
+
+def drift_report(inp: AudioInput, mode: str = "excerpt") -> Dict[str, Any]:
+    """
+    Analyze a file both fully and in the given mode (uncached) and report
+    the relative drift of every feature plus the wall time of each path.
+    """
+    timings: Dict[str, float] = {}
+    results: Dict[str, Dict[str, float]] = {}
+    for name in ("full", mode):
+        if hasattr(inp, "seek"):
+            inp.seek(0)
+        start = time.perf_counter()
+        results[name] = _analyze(inp, name)
+        timings[name] = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "reference": results["full"],
+        "features": results[mode],
+        "drift": feature_drift(results["full"], results[mode]),
+        "seconds": timings,
+    }
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+CACHE_DIR = Path("data/cache/analysis")
+
+
+def content_key(data: Union[bytes, Iterable[bytes]], config: str) -> str:
+    """
+    Cache key for an upload: hash of its raw bytes plus the analysis config,
+    so a feature change never serves numbers computed by older code.
+    data may be given as consecutive chunks to avoid holding a large file in memory.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(config.encode())
+    h.update(b"\0")
+    for chunk in ([data] if isinstance(data, (bytes, bytearray, memoryview)) else data):
+        h.update(chunk)
+    return h.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Two-tier cache of feature dicts.
+    Memory: LRU bounded by entry count.
+    Disk: one small JSON file per key, bounded by total bytes,
+    least recently used files are evicted first.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = CACHE_DIR,
+        max_entries: int = 256,
+        max_disk_bytes: int = 32 * 1024 * 1024,
+    ):
+        self.directory = Path(directory) if directory is not None else None
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+
+    # ---------------------------
+    # Lookup
+    # ---------------------------
+    def get(self, key: str) -> Optional[Dict[str, float]]:
+        with self._lock:
+            feats = self._memory.get(key)
+            if feats is not None:
+                self._memory.move_to_end(key)
+                return dict(feats)
+
+        feats = self._read_disk(key)
+        if feats is not None:
+            self._remember(key, feats)
+            return dict(feats)
+        return None
+
+    def put(self, key: str, feats: Dict[str, float]) -> None:
+        feats = dict(feats)
+        self._remember(key, feats)
+        self._write_disk(key, feats)
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+    # ---------------------------
+    # Memory tier
+    # ---------------------------
+    def _remember(self, key: str, feats: Dict[str, float]) -> None:
+        with self._lock:
+            self._memory[key] = feats
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    # ---------------------------
+    # Disk tier
+    # ---------------------------
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, float]]:
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            feats = json.loads(path.read_text())
+            # bump mtime so eviction treats the file as recently used
+            os.utime(path)
+            return feats
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, feats: Dict[str, float]) -> None:
+        if self.directory is None:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            payload = json.dumps(feats)
+
+            # write-then-rename so concurrent readers never see half a file
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(payload)
+            os.replace(tmp, path)
+
+            with self._lock:
+                if self._disk_bytes is not None:
+                    self._disk_bytes += len(payload)
+            self._evict_disk()
+        except OSError as e:
+            print(f"Could not write analysis cache entry: {e}")
+
+    def _evict_disk(self) -> None:
+        with self._lock:
+            if self._disk_bytes is not None and self._disk_bytes <= self.max_disk_bytes:
+                return
+
+            entries = []
+            for p in self.directory.glob("*.json"):
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+
+            total = sum(size for _, size, _ in entries)
+            entries.sort()
+            for _, size, p in entries:
+                if total <= self.max_disk_bytes:
+                    break
+                try:
+                    p.unlink()
+                    total -= size
+                except OSError:
+                    pass
+
+            self._disk_bytes = total
+
+
+_default_cache: Optional[AnalysisCache] = None
+_default_lock = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    # one cache per process, shared by every Streamlit session
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = AnalysisCache()
+        return _default_cache
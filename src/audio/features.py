@@ -1,26 +1,288 @@
 import librosa
 import numpy as np
-from typing import Dict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Union
 
-def extract_features(y: np.ndarray, sr: int) -> Dict[str, float]:
-   
+# analysis parameters shared by every feature (librosa defaults)
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MELS = 128
+N_MFCC = 13
+
+# bump whenever a change here alters the numbers extract_features returns
+FEATURE_VERSION = "1"
+
+
+class Spectra(NamedTuple):
+    """
+    Intermediate representations computed once per clip.
+    Every feature is derived from these instead of from the raw waveform.
+    """
+    magnitude: np.ndarray   # |STFT|, (1 + N_FFT // 2, frames)
+    power: np.ndarray       # |STFT| ** 2
+    mel_db: np.ndarray      # log-power mel spectrogram, (N_MELS, frames)
+    onset_env: np.ndarray   # onset strength envelope, (frames,)
+
+
+def compute_spectra(y: np.ndarray, sr: int) -> Spectra:
+    """
+    Run the STFT, mel filterbank and onset detector exactly once.
+    """
+    magnitude = np.abs(librosa.stft(y, n_fft=N_FFT, hop_length=HOP_LENGTH))
+    power = magnitude ** 2
+
+    mel_basis = librosa.filters.mel(sr=sr, n_fft=N_FFT, n_mels=N_MELS)
+    mel_db = librosa.power_to_db(mel_basis @ power)
+
+    # beat_track aggregates its onset envelope with the median
+    onset_env = librosa.onset.onset_strength(
+        S=mel_db, sr=sr, hop_length=HOP_LENGTH, aggregate=np.median
+    )
+
+    return Spectra(magnitude, power, mel_db, onset_env)
+
+
+# tempogram columns computed per chunk; keeps tempo estimation memory flat
+TEMPOGRAM_CHUNK = 2048
+
+
+def tempogram_sum(onset_env: np.ndarray, sr: int) -> np.ndarray:
+    """
+    Autocorrelation tempogram of an onset envelope, summed over time.
+    Columns are computed chunk by chunk instead of materialising a
+    (win_length, frames) matrix for the whole clip.
+    """
+    win_length = int(librosa.time_to_frames(8.0, sr=sr, hop_length=HOP_LENGTH))
+    n = len(onset_env)
+    half = win_length // 2
+    padded = np.pad(onset_env, (half, half), mode="linear_ramp", end_values=(0, 0))
+
+    tg_sum = np.zeros(win_length)
+    for start in range(0, n, TEMPOGRAM_CHUNK):
+        stop = min(start + TEMPOGRAM_CHUNK, n)
+        tg = librosa.feature.tempogram(
+            onset_envelope=padded[start: stop + win_length - 1],
+            sr=sr,
+            hop_length=HOP_LENGTH,
+            win_length=win_length,
+            center=False,
+        )
+        tg_sum += tg.sum(axis=1)
+    return tg_sum
+
+
+def tempo_from_tempogram(tg_mean: np.ndarray, sr: int) -> float:
+    tempo = librosa.feature.tempo(tg=tg_mean[:, None], sr=sr, hop_length=HOP_LENGTH)
+    return float(tempo[0])
+
+
+def estimate_tempo(onset_env: np.ndarray, sr: int) -> float:
+    # same estimate beat_track reports, without running the beat tracker itself
+    if not onset_env.any():
+        return 0.0
+    return tempo_from_tempogram(tempogram_sum(onset_env, sr) / len(onset_env), sr)
+
+
+def spectral_centroid(magnitude: np.ndarray, sr: int) -> np.ndarray:
+    # one matrix-vector product instead of librosa's per-call normalisation pass
+    freqs = librosa.fft_frequencies(sr=sr, n_fft=N_FFT).astype(magnitude.dtype)
+    weighted = freqs @ magnitude
+    total = magnitude.sum(axis=0)
+    safe = total > np.finfo(magnitude.dtype).tiny
+    return np.where(safe, weighted / np.where(safe, total, 1.0), 0.0)
+
+
+def zero_crossing_rate(y: np.ndarray) -> np.ndarray:
+    """
+    Frame-wise zero crossing rate, equal to librosa.feature.zero_crossing_rate
+    (centered, edge padded) but counted with one cumulative sum over the signal.
+    """
+    pad = N_FFT // 2
+    y = np.pad(y, pad, mode="edge")
+    y = np.where(np.abs(y) <= 1e-10, 0.0, y)
+
+    negative = np.signbit(y)
+    crossings = np.concatenate(([0], np.cumsum(negative[1:] != negative[:-1])))
+
+    n_frames = 1 + (len(y) - N_FFT) // HOP_LENGTH
+    starts = np.arange(n_frames) * HOP_LENGTH
+    counts = crossings[starts + N_FFT - 1] - crossings[starts]
+    return counts / N_FFT
+
+
+def extract_features(y: Union[np.ndarray, Iterable[np.ndarray]], sr: int) -> Dict[str, float]:
+    """
+    Summary features for a clip.
+    y may also be an iterable of consecutive blocks (see load_audio(mode="stream")),
+    in which case the clip is never held in memory as a whole.
+    """
+    if not isinstance(y, np.ndarray):
+        stream = StreamingFeatures(sr)
+        for block in y:
+            stream.update(block)
+        return stream.result()
+
+    spectra = compute_spectra(y, sr)
     feats: Dict[str, float] = {}
 
     # tempo
-    tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-    feats["tempo_bpm"] = float(tempo)
+    feats["tempo_bpm"] = estimate_tempo(spectra.onset_env, sr)
 
     # brightness
-    centroid = librosa.feature.spectral_centroid(y=y, sr=sr)
+    centroid = spectral_centroid(spectra.magnitude, sr)
     feats["spectral_centroid_mean"] = float(np.mean(centroid))
 
-    # noisiness / percussiveness proxy
-    zcr = librosa.feature.zero_crossing_rate(y)
+    # noisiness / percussiveness proxy (time domain, no spectrum needed)
+    zcr = zero_crossing_rate(y)
     feats["zcr_mean"] = float(np.mean(zcr))
 
     # mfcc summary
-    mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
+    mfcc = librosa.feature.mfcc(S=spectra.mel_db, n_mfcc=N_MFCC)
     feats["mfcc_mean"] = float(np.mean(mfcc))
     feats["mfcc_std"] = float(np.std(mfcc))
 
     return feats
+
+
+def extract_excerpt_features(windows: Sequence[np.ndarray], sr: int) -> Dict[str, float]:
+    """
+    Features for a clip known only through a few excerpts (load_audio(mode="excerpt")).
+    Frames of all windows are pooled, as if the excerpts were the whole clip;
+    tempo comes from the frame-weighted average tempogram.
+    """
+    centroid, zcr, mfcc = RunningStats(), RunningStats(), RunningStats()
+    tg_sum: Optional[np.ndarray] = None
+    onset_frames = 0
+
+    for y in windows:
+        spectra = compute_spectra(y, sr)
+        centroid.update(spectral_centroid(spectra.magnitude, sr))
+        zcr.update(zero_crossing_rate(y))
+        mfcc.update(librosa.feature.mfcc(S=spectra.mel_db, n_mfcc=N_MFCC))
+
+        if spectra.onset_env.any():
+            window_sum = tempogram_sum(spectra.onset_env, sr)
+            tg_sum = window_sum if tg_sum is None else tg_sum + window_sum
+        onset_frames += len(spectra.onset_env)
+
+    return {
+        "tempo_bpm": 0.0 if tg_sum is None else tempo_from_tempogram(tg_sum / onset_frames, sr),
+        "spectral_centroid_mean": float(centroid.mean),
+        "zcr_mean": float(zcr.mean),
+        "mfcc_mean": float(mfcc.mean),
+        "mfcc_std": mfcc.std,
+    }
+
+
+def feature_drift(reference: Dict[str, float], candidate: Dict[str, float]) -> Dict[str, float]:
+    """
+    Relative difference of each feature against a reference analysis.
+    """
+    drift: Dict[str, float] = {}
+    for key, ref in reference.items():
+        if key in candidate:
+            drift[key] = abs(candidate[key] - ref) / max(abs(ref), 1e-9)
+    return drift
+
+
+class RunningStats:
+    """
+    Mean / std accumulator (Chan et al. parallel update), fed one batch at a time.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        n = values.size
+        if n == 0:
+            return
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self._m2 += batch_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self._m2 / self.count)) if self.count else 0.0
+
+
+class StreamingFeatures:
+    """
+    Block-by-block version of extract_features with memory independent of clip length.
+
+    Frames line up exactly with the centered STFT of the whole clip. Two
+    approximations remain: the 80 dB floor of the mel spectrogram is taken
+    relative to the loudest frame seen so far rather than the whole clip,
+    and the ZCR frames at the very edges are zero- rather than edge-padded.
+    """
+
+    def __init__(self, sr: int):
+        self.sr = sr
+        self._mel_basis = librosa.filters.mel(sr=sr, n_fft=N_FFT, n_mels=N_MELS)
+
+        # leading half window of zeros reproduces the centered STFT
+        self._carry = np.zeros(N_FFT // 2, dtype=np.float32)
+        self._db_max = -np.inf
+        self._prev_mel_db: Optional[np.ndarray] = None
+
+        self._frames = 0
+        self._onset: List[np.ndarray] = []
+        self.centroid = RunningStats()
+        self.zcr = RunningStats()
+        self.mfcc = RunningStats()
+
+    def update(self, block: np.ndarray) -> None:
+        buf = np.concatenate((self._carry, np.asarray(block, dtype=np.float32)))
+        n_frames = 0 if len(buf) < N_FFT else 1 + (len(buf) - N_FFT) // HOP_LENGTH
+        if n_frames:
+            self._process(buf[: (n_frames - 1) * HOP_LENGTH + N_FFT])
+        self._carry = buf[n_frames * HOP_LENGTH:]
+
+    def result(self) -> Dict[str, float]:
+        # trailing half window of zeros, as the centered STFT would add
+        self.update(np.zeros(N_FFT // 2, dtype=np.float32))
+        self._carry = np.zeros(0, dtype=np.float32)
+
+        # onset_strength left-pads by lag + N_FFT // (2 * HOP_LENGTH) frames
+        pad = np.zeros(1 + N_FFT // (2 * HOP_LENGTH), dtype=np.float32)
+        onset_env = np.concatenate([pad] + self._onset)[: self._frames]
+
+        return {
+            "tempo_bpm": estimate_tempo(onset_env, self.sr),
+            "spectral_centroid_mean": float(self.centroid.mean),
+            "zcr_mean": float(self.zcr.mean),
+            "mfcc_mean": float(self.mfcc.mean),
+            "mfcc_std": self.mfcc.std,
+        }
+
+    def _process(self, buf: np.ndarray) -> None:
+        magnitude = np.abs(librosa.stft(buf, n_fft=N_FFT, hop_length=HOP_LENGTH, center=False))
+        self._frames += magnitude.shape[1]
+
+        self.centroid.update(spectral_centroid(magnitude, self.sr))
+
+        frames = librosa.util.frame(buf, frame_length=N_FFT, hop_length=HOP_LENGTH)
+        negative = np.signbit(np.where(np.abs(frames) <= 1e-10, 0.0, frames))
+        self.zcr.update(np.count_nonzero(negative[1:] != negative[:-1], axis=0) / N_FFT)
+
+        log_mel = 10.0 * np.log10(np.maximum(1e-10, self._mel_basis @ magnitude ** 2))
+        self._db_max = max(self._db_max, float(log_mel.max()))
+        mel_db = np.maximum(log_mel, self._db_max - 80.0)
+
+        self.mfcc.update(librosa.feature.mfcc(S=mel_db, n_mfcc=N_MFCC))
+
+        # onset strength: median over bands of the positive first difference
+        if self._prev_mel_db is not None:
+            mel_db_lagged = np.concatenate((self._prev_mel_db, mel_db), axis=1)
+        else:
+            mel_db_lagged = mel_db
+        flux = np.maximum(0.0, np.diff(mel_db_lagged, axis=1))
+        self._onset.append(np.median(flux, axis=0).astype(np.float32))
+        self._prev_mel_db = mel_db[:, -1:]
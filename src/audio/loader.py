@@ -1,16 +1,143 @@
 import librosa
 import numpy as np
-from typing import Any, Tuple, Union
+import soundfile as sf
+import soxr
+from typing import Any, Iterator, List, Tuple, Union
 
 AudioInput = Union[str, Any]
 
+# frames decoded per read in stream mode (~3 s at 22050 Hz)
+STREAM_BLOCK_SIZE = 65536
+
+# excerpt mode: a cheap probe scan picks which windows are worth decoding
+EXCERPT_WINDOWS = 3
+EXCERPT_SECONDS = 10.0
+EXCERPT_PROBES = 24
+PROBE_SECONDS = 1.0
+EXCERPT_STRATEGIES = ("loudest", "stable")
+
+LOAD_MODES = ("full", "stream", "excerpt")
+
+
 def load_audio(
     inp: AudioInput,
     sr: int = 22050,
-    mono: bool = True
-) -> Tuple[np.ndarray, int]:
+    mono: bool = True,
+    mode: str = "full",
+    block_size: int = STREAM_BLOCK_SIZE,
+) -> Tuple[Union[np.ndarray, Iterator[np.ndarray]], int]:
     """
     Load audio from a file path OR a Streamlit UploadedFile.
+
+    mode="full" decodes the whole file into one array.
+    mode="stream" returns a generator of mono float32 blocks instead, so
+    memory stays flat however long the file is (always downmixed).
+    mode="excerpt" returns a short list of representative mono windows
+    (see load_excerpts), so decode work is capped per file.
+    """
+    if mode == "full":
+        y, sample_rate = librosa.load(inp, sr=sr, mono=mono)
+        return y, int(sample_rate)
+
+    if mode == "stream":
+        f = sf.SoundFile(inp)
+        target_sr = int(sr) if sr else f.samplerate
+        return _stream_blocks(f, target_sr, block_size), target_sr
+
+    if mode == "excerpt":
+        return load_excerpts(inp, sr=sr)
+
+    raise ValueError(f"Unknown load mode '{mode}', expected one of {LOAD_MODES}")
+
+
+def _stream_blocks(f: sf.SoundFile, sr: int, block_size: int) -> Iterator[np.ndarray]:
+    # decode -> downmix -> resample one block at a time
+    resampler = None
+    if f.samplerate != sr:
+        resampler = soxr.ResampleStream(f.samplerate, sr, 1, dtype="float32", quality="HQ")
+
+    with f:
+        for block in f.blocks(blocksize=block_size, dtype="float32", always_2d=True):
+            y = block.mean(axis=1)
+            if resampler is not None:
+                y = resampler.resample_chunk(y)
+            if len(y):
+                yield y
+
+        if resampler is not None:
+            tail = resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+            if len(tail):
+                yield tail
+
+
+def load_excerpts(
+    inp: AudioInput,
+    sr: int = 22050,
+    n_windows: int = EXCERPT_WINDOWS,
+    window_seconds: float = EXCERPT_SECONDS,
+    strategy: str = "loudest",
+) -> Tuple[List[np.ndarray], int]:
     """
-    y, sample_rate = librosa.load(inp, sr=sr, mono=mono)
-    return y, int(sample_rate)
+    Decode only a few representative windows of a file.
+
+    A probe scan seeks to EXCERPT_PROBES evenly spaced points and decodes
+    PROBE_SECONDS at each. Probes are scored by loudness ("loudest") or by how
+    steady their level is ("stable"), and the best non-overlapping windows
+    around them are decoded. Files too short to benefit are decoded whole.
+    Windows come back in time order, mono, resampled to sr.
+    """
+    if strategy not in EXCERPT_STRATEGIES:
+        raise ValueError(f"Unknown excerpt strategy '{strategy}', expected one of {EXCERPT_STRATEGIES}")
+
+    with sf.SoundFile(inp) as f:
+        native_sr = f.samplerate
+        target_sr = int(sr) if sr else native_sr
+        window = int(window_seconds * native_sr)
+        total = f.frames
+
+        if total <= window * n_windows * 1.5:
+            return [_resample(_read_mono(f, 0, total), native_sr, target_sr)], target_sr
+
+        # probe scan
+        probe = int(PROBE_SECONDS * native_sr) // 4 * 4
+        centers = np.linspace(window // 2, total - window // 2, EXCERPT_PROBES).astype(int)
+        scores = np.empty(len(centers))
+        for i, c in enumerate(centers):
+            levels = np.sqrt(np.mean(
+                _read_mono(f, c - probe // 2, probe).reshape(4, -1) ** 2, axis=1
+            ))
+            if strategy == "loudest":
+                scores[i] = levels.mean()
+            else:
+                scores[i] = -levels.std() / (levels.mean() + 1e-9)
+
+        # best probes first, skipping any whose window would overlap one already taken
+        starts: List[int] = []
+        for i in np.argsort(-scores, kind="stable"):
+            start = int(centers[i]) - window // 2
+            if all(abs(start - s) >= window for s in starts):
+                starts.append(start)
+            if len(starts) == n_windows:
+                break
+
+        windows = [
+            _resample(_read_mono(f, start, window), native_sr, target_sr)
+            for start in sorted(starts)
+        ]
+    return windows, target_sr
+
+
+def _read_mono(f: sf.SoundFile, start: int, frames: int) -> np.ndarray:
+    # seek + read touches only this range of the file
+    f.seek(max(0, start))
+    block = f.read(frames, dtype="float32", always_2d=True)
+    y = block.mean(axis=1)
+    if len(y) < frames:
+        y = np.pad(y, (0, frames - len(y)))
+    return y
+
+
+def _resample(y: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    if orig_sr == target_sr:
+        return y
+    return soxr.resample(y, orig_sr, target_sr, quality="HQ")
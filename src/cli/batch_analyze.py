@@ -0,0 +1,201 @@
+"""
+Batch mood / genre analysis over a directory or manifest of audio files.
+
+    python -m src.cli.batch_analyze --dir music/ --out moods.csv
+    python -m src.cli.batch_analyze --manifest files.txt --out moods.parquet --workers 16
+
+Files are analyzed across a process pool. Results are flushed every
+--flush-every rows, so an interrupted run resumes where it stopped:
+files already present in the output are skipped.
+CSV output is appended in place. Parquet output is a directory of part files.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import pandas as pd
+
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".ogg", ".flac"}
+
+FEATURE_COLUMNS = ["tempo_bpm", "spectral_centroid_mean", "zcr_mean", "mfcc_mean", "mfcc_std"]
+OUTPUT_COLUMNS = ["path"] + FEATURE_COLUMNS + ["mood", "genre", "error", "seconds"]
+
+
+# ---------------------------
+# Inputs
+# ---------------------------
+def find_audio_files(root: Path) -> List[str]:
+    files = [
+        str(p) for p in root.rglob("*")
+        if p.is_file() and p.suffix.lower() in AUDIO_EXTENSIONS
+    ]
+    return sorted(files)
+
+
+def read_manifest(path: Path) -> List[str]:
+    """
+    A manifest is either a CSV with a 'path' column or a plain list of paths, one per line.
+    """
+    if path.suffix.lower() == ".csv":
+        return [str(p) for p in pd.read_csv(path)["path"].dropna()]
+    lines = path.read_text().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+# ---------------------------
+# Output
+# ---------------------------
+def _is_parquet(out: Path) -> bool:
+    return out.suffix.lower() in (".parquet", ".pq")
+
+
+def read_done(out: Path, retry_failed: bool = False) -> Set[str]:
+    """
+    Paths already recorded in the output (failures too, unless retry_failed).
+    """
+    if not out.exists():
+        return set()
+    if _is_parquet(out):
+        parts = sorted(out.glob("part-*.parquet"))
+        if not parts:
+            return set()
+        df = pd.concat([pd.read_parquet(p, columns=["path", "error"]) for p in parts])
+    else:
+        df = pd.read_csv(out, usecols=["path", "error"])
+
+    if retry_failed:
+        df = df[df["error"].isna()]
+    return set(df["path"])
+
+
+def write_rows(out: Path, rows: List[Dict[str, Any]]) -> None:
+    if not rows:
+        return
+    df = pd.DataFrame(rows, columns=OUTPUT_COLUMNS)
+
+    if _is_parquet(out):
+        out.mkdir(parents=True, exist_ok=True)
+        part = len(list(out.glob("part-*.parquet")))
+        tmp = out / f".part-{part:05d}.tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, out / f"part-{part:05d}.parquet")
+    else:
+        out.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(out, mode="a", header=not out.exists(), index=False)
+
+
+# ---------------------------
+# Worker
+# ---------------------------
+def _init_worker() -> None:
+    # one process per core already; stop BLAS / FFT pools from oversubscribing
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(1)
+
+
+def analyze_file(path: str, mode: str = "full") -> Dict[str, Any]:
+    from src.audio.analyze import analyze_audio
+    from src.ml.mood_model import predict_mood
+    from src.ml.genre_model import predict_genre
+
+    row: Dict[str, Any] = {"path": path, "error": None}
+    start = time.perf_counter()
+    try:
+        feats = analyze_audio(path, mode=mode, use_cache=False)
+        row.update({k: feats.get(k) for k in FEATURE_COLUMNS})
+        row["mood"] = predict_mood(feats)
+        row["genre"] = predict_genre(feats)
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["seconds"] = round(time.perf_counter() - start, 4)
+    return row
+
+
+# ---------------------------
+# Driver
+# ---------------------------
+def run_batch(
+    paths: Iterable[str],
+    out: Path,
+    workers: Optional[int] = None,
+    mode: str = "full",
+    flush_every: int = 200,
+    retry_failed: bool = False,
+    progress_every: float = 5.0,
+) -> Dict[str, int]:
+    done = read_done(out, retry_failed=retry_failed)
+    todo = [p for p in dict.fromkeys(paths) if p not in done]
+    total = len(todo)
+    print(f"{len(done)} already done, {total} to analyze", file=sys.stderr)
+
+    stats = {"analyzed": 0, "failed": 0, "skipped": len(done)}
+    if not todo:
+        return stats
+
+    pending: List[Dict[str, Any]] = []
+    start = last_report = time.monotonic()
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker) as pool:
+        futures = [pool.submit(analyze_file, p, mode) for p in todo]
+        try:
+            for fut in as_completed(futures):
+                row = fut.result()
+                pending.append(row)
+                stats["analyzed"] += 1
+                if row["error"]:
+                    stats["failed"] += 1
+
+                if len(pending) >= flush_every:
+                    write_rows(out, pending)
+                    pending = []
+
+                now = time.monotonic()
+                if now - last_report >= progress_every or stats["analyzed"] == total:
+                    last_report = now
+                    rate = stats["analyzed"] / max(now - start, 1e-9)
+                    eta = (total - stats["analyzed"]) / rate if rate else float("inf")
+                    print(
+                        f"[{stats['analyzed']}/{total}] {rate:.1f} files/s, "
+                        f"{stats['failed']} failed, ETA {eta:.0f}s",
+                        file=sys.stderr,
+                    )
+        finally:
+            # keep whatever finished, so a Ctrl-C run resumes from here
+            write_rows(out, pending)
+            for fut in futures:
+                fut.cancel()
+
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze mood and genre for many audio files.")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--dir", type=Path, help="directory to walk for audio files")
+    src.add_argument("--manifest", type=Path, help="text file of paths, or CSV with a 'path' column")
+    parser.add_argument("--out", type=Path, required=True, help="output .csv file or .parquet directory")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--mode", default="full", choices=["full", "stream", "excerpt"])
+    parser.add_argument("--flush-every", type=int, default=200)
+    parser.add_argument("--retry-failed", action="store_true", help="re-run files that errored last time")
+    args = parser.parse_args(argv)
+
+    paths = find_audio_files(args.dir) if args.dir else read_manifest(args.manifest)
+    stats = run_batch(
+        paths,
+        args.out,
+        workers=args.workers,
+        mode=args.mode,
+        flush_every=args.flush_every,
+        retry_failed=args.retry_failed,
+    )
+    print(f"done: {stats}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+# src/ml/backend.py
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from src.ml.feature_matrix import MODEL_FEATURES, feature_matrix
+
+MODEL_DIR = Path(os.environ.get("MOODFLOW_MODEL_DIR", "models"))
+TASKS = ("mood", "genre")
+
+
+class LinearModel:
+    """
+    Multinomial logistic regression over standardised MODEL_FEATURES.
+
+    Inference is a single matrix product and softmax in NumPy, so serving
+    never imports scikit-learn (that only happens in src.ml.train).
+    Missing features are imputed with the training mean.
+    """
+
+    def __init__(
+        self,
+        classes: Sequence[str],
+        mean: np.ndarray,
+        scale: np.ndarray,
+        coef: np.ndarray,
+        intercept: np.ndarray,
+        features: Sequence[str] = MODEL_FEATURES,
+    ):
+        if tuple(features) != MODEL_FEATURES:
+            raise ValueError(
+                f"Model was trained on features {tuple(features)}, "
+                f"but the current schema is {MODEL_FEATURES}. Retrain it."
+            )
+        self.classes = np.asarray(classes)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+
+    # ---------------------------
+    # Inference
+    # ---------------------------
+    def predict_proba(self, rows: Any) -> np.ndarray:
+        X = feature_matrix(rows)
+        X = np.where(np.isnan(X), self.mean, X)
+        logits = ((X - self.mean) / self.scale) @ self.coef.T + self.intercept
+        logits -= logits.max(axis=1, keepdims=True)
+        p = np.exp(logits)
+        return p / p.sum(axis=1, keepdims=True)
+
+    def predict(self, rows: Any) -> np.ndarray:
+        return self.classes[np.argmax(self.predict_proba(rows), axis=1)]
+
+    # ---------------------------
+    # Serialization
+    # ---------------------------
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                classes=self.classes.astype(str),
+                mean=self.mean,
+                scale=self.scale,
+                coef=self.coef,
+                intercept=self.intercept,
+                features=np.asarray(MODEL_FEATURES),
+            )
+
+    @classmethod
+    def load(cls, path: Path) -> "LinearModel":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                classes=data["classes"],
+                mean=data["mean"],
+                scale=data["scale"],
+                coef=data["coef"],
+                intercept=data["intercept"],
+                features=[str(f) for f in data["features"]],
+            )
+
+
+def model_path(task: str, model_dir: Optional[Path] = None) -> Path:
+    return Path(model_dir or MODEL_DIR) / f"{task}.npz"
+
+
+_models: Dict[str, Optional[LinearModel]] = {}
+_models_lock = threading.Lock()
+
+
+def get_model(task: str) -> Optional[LinearModel]:
+    """
+    Trained model for a task, or None when no artifact exists.
+    Loaded at most once per process and shared by every request.
+    """
+    if task in _models:
+        return _models[task]
+
+    with _models_lock:
+        if task not in _models:
+            path = model_path(task)
+            _models[task] = LinearModel.load(path) if path.exists() else None
+        return _models[task]
+
+
+def reset_models() -> None:
+    # forget loaded artifacts (after retraining, or in tests)
+    with _models_lock:
+        _models.clear()
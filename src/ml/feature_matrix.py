@@ -0,0 +1,54 @@
+# src/ml/feature_matrix.py
+from typing import Any, Dict, Mapping, Sequence
+
+import numpy as np
+
+# inputs read by the rule-based mood / genre models, in ndarray column order
+HEURISTIC_COLUMNS = ("energy", "tempo_bpm", "spectral_centroid")
+HEURISTIC_DEFAULTS = {"energy": 0.5, "tempo_bpm": 120.0, "spectral_centroid": 2000.0}
+
+# fixed input schema of trained models, built from extract_features output.
+# changing it invalidates every saved artifact (they record the schema they were trained on)
+MODEL_FEATURES = ("tempo_bpm", "spectral_centroid_mean", "zcr_mean", "mfcc_mean", "mfcc_std")
+MODEL_DEFAULTS = {name: float("nan") for name in MODEL_FEATURES}
+
+
+def as_columns(
+    rows: Any,
+    columns: Sequence[str] = HEURISTIC_COLUMNS,
+    defaults: Mapping[str, float] = HEURISTIC_DEFAULTS,
+) -> Dict[str, np.ndarray]:
+    """
+    Normalise a batch of feature rows into one float array per column.
+
+    Accepts a pandas DataFrame, a mapping of column -> values, a list of
+    feature dicts, or an ndarray whose columns follow `columns`.
+    Missing columns / keys take their default, like dict.get in the scalar models.
+    """
+    if isinstance(rows, np.ndarray):
+        arr = np.atleast_2d(np.asarray(rows, dtype=float))
+        if arr.shape[1] != len(columns):
+            raise ValueError(f"Expected {len(columns)} feature columns {tuple(columns)}, got {arr.shape[1]}")
+        return {c: arr[:, i] for i, c in enumerate(columns)}
+
+    if isinstance(rows, Mapping) or hasattr(rows, "columns"):
+        keys = rows.columns if hasattr(rows, "columns") else rows.keys()
+        n = len(rows) if hasattr(rows, "columns") else len(next(iter(rows.values()), []))
+        return {
+            c: np.asarray(rows[c], dtype=float) if c in keys else np.full(n, defaults[c])
+            for c in columns
+        }
+
+    # sequence of dicts
+    return {
+        c: np.array([r.get(c, defaults[c]) for r in rows], dtype=float)
+        for c in columns
+    }
+
+
+def feature_matrix(rows: Any) -> np.ndarray:
+    """
+    (n_rows, len(MODEL_FEATURES)) float matrix; missing features are NaN.
+    """
+    cols = as_columns(rows, MODEL_FEATURES, MODEL_DEFAULTS)
+    return np.column_stack([cols[name] for name in MODEL_FEATURES])
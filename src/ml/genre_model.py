@@ -1,6 +1,46 @@
 # src/ml/genre_model.py
 from typing import Dict
 
+import numpy as np
+
+from src.ml.backend import get_model
+from src.ml.feature_matrix import as_columns
+
+
+def rule_based_genre_batch(rows) -> np.ndarray:
+    """
+    Vectorised rule-based genre over many feature rows
+    (DataFrame, ndarray in HEURISTIC_COLUMNS order, or list of dicts).
+    Returns one label per row.
+    """
+    cols = as_columns(rows)
+    energy = cols["energy"]
+    tempo = cols["tempo_bpm"]
+    spectral_centroid = cols["spectral_centroid"]
+
+    # Simple rule-based baseline (replace with ML later), first match wins
+    conditions = [
+        (energy > 0.8) & (tempo > 130),
+        energy > 0.7,
+        (spectral_centroid < 1500) & (tempo < 100),
+        energy < 0.4,
+        tempo < 90,
+    ]
+    labels = ["edm", "rock", "lofi", "ambient", "jazz"]
+
+    return np.select(conditions, labels, default="pop")
+
+
+def predict_genre_batch(rows) -> np.ndarray:
+    """
+    One genre label per feature row. Uses the trained model when
+    models/genre.npz exists (see src.ml.train), otherwise the rules.
+    """
+    model = get_model("genre")
+    if model is not None:
+        return model.predict(rows)
+    return rule_based_genre_batch(rows)
+
 
 def predict_genre(features: Dict) -> str:
     """
@@ -9,21 +49,4 @@ def predict_genre(features: Dict) -> str:
     This is a semantic prediction (ML-facing),
     not constrained to Spotify seed genres.
     """
-
-    energy = features.get("energy", 0.5)
-    tempo = features.get("tempo_bpm", 120)
-    spectral_centroid = features.get("spectral_centroid", 2000)
-
-    # Simple rule-based baseline (replace with ML later)
-    if energy > 0.8 and tempo > 130:
-        return "edm"
-    elif energy > 0.7:
-        return "rock"
-    elif spectral_centroid < 1500 and tempo < 100:
-        return "lofi"
-    elif energy < 0.4:
-        return "ambient"
-    elif tempo < 90:
-        return "jazz"
-    else:
-        return "pop"
+    return str(predict_genre_batch([features])[0])
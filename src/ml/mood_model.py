@@ -1,24 +1,42 @@
-def predict_mood(audio_feat: dict) -> str:
+import numpy as np
+
+from src.ml.backend import get_model
+from src.ml.feature_matrix import as_columns
+
+
+def rule_based_mood_batch(rows) -> np.ndarray:
+    """
+    Vectorised rule-based mood over many feature rows
+    (DataFrame, ndarray in HEURISTIC_COLUMNS order, or list of dicts).
+    Returns one label per row.
+    """
+    cols = as_columns(rows)
+    energy = cols["energy"]
+    tempo = cols["tempo_bpm"]
+
+    # conditions in priority order; the first match wins
+    conditions = [
+        (energy > 0.7) & (tempo > 120),     # High energy + fast tempo = happy/energetic
+        (energy > 0.7) & (tempo <= 120),    # High energy + slower tempo = energetic but intense
+        (energy < 0.4) & (tempo < 100),     # Low energy + slow tempo = sad/melancholic
+        energy < 0.4,                       # Low energy + medium tempo = calm/relaxed
+    ]
+    labels = ["happy", "energetic", "sad", "calm"]
 
-    energy = audio_feat.get("energy", 0.5)
-    tempo = audio_feat.get("tempo_bpm", 120)
-    spectral_centroid = audio_feat.get("spectral_centroid", 2000)
-    
-    # High energy + fast tempo = happy/energetic
-    if energy > 0.7 and tempo > 120:
-        return "happy"
-    
-    # High energy + slower tempo = energetic but intense
-    if energy > 0.7 and tempo <= 120:
-        return "energetic"
-    
-    # Low energy + slow tempo = sad/melancholic
-    if energy < 0.4 and tempo < 100:
-        return "sad"
-    
-    # Low energy + medium tempo = calm/relaxed
-    if energy < 0.4:
-        return "calm"
-    
     # Everything else
-    return "neutral"
\ No newline at end of file
+    return np.select(conditions, labels, default="neutral")
+
+
+def predict_mood_batch(rows) -> np.ndarray:
+    """
+    One mood label per feature row. Uses the trained model when
+    models/mood.npz exists (see src.ml.train), otherwise the rules.
+    """
+    model = get_model("mood")
+    if model is not None:
+        return model.predict(rows)
+    return rule_based_mood_batch(rows)
+
+
+def predict_mood(audio_feat: dict) -> str:
+    return str(predict_mood_batch([audio_feat])[0])
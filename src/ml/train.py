@@ -0,0 +1,104 @@
+"""
+Train a mood or genre classifier from analyzed features.
+
+    python -m src.ml.train --task mood --features moods.csv --labels mood_labels.csv
+
+--features is the output of src.cli.batch_analyze (CSV or Parquet directory).
+--labels is a CSV with 'path' and 'label' columns. You can leave it out
+if the features file already has a 'label' column. The artifact is written
+to models/<task>.npz, where src.ml.backend picks it up on next start.
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.ml.backend import TASKS, LinearModel, model_path
+from src.ml.feature_matrix import MODEL_FEATURES, feature_matrix
+
+
+def train_model(rows: Any, labels: Sequence[str], C: float = 1.0) -> LinearModel:
+    """
+    Fit a standardised multinomial logistic regression and export it as a LinearModel.
+    """
+    from sklearn.linear_model import LogisticRegression
+
+    X = feature_matrix(rows)
+    y = np.asarray(labels).astype(str)
+
+    keep = ~np.isnan(X).any(axis=1)
+    X, y = X[keep], y[keep]
+    if len(np.unique(y)) < 2:
+        raise ValueError("Need at least two distinct labels to train a classifier")
+
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+
+    clf = LogisticRegression(C=C, max_iter=1000)
+    clf.fit((X - mean) / scale, y)
+
+    coef, intercept = clf.coef_, clf.intercept_
+    if len(clf.classes_) == 2:
+        # binary models keep one weight row; a zero row for the first class gives the same softmax
+        coef = np.vstack([np.zeros_like(coef), coef])
+        intercept = np.concatenate([[0.0], intercept])
+
+    return LinearModel(clf.classes_, mean, scale, coef, intercept)
+
+
+def read_table(path: Path) -> pd.DataFrame:
+    if path.is_dir():
+        return pd.concat(pd.read_parquet(p) for p in sorted(path.glob("part-*.parquet")))
+    if path.suffix.lower() in (".parquet", ".pq"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def load_training_table(features: Path, labels: Optional[Path] = None) -> pd.DataFrame:
+    df = read_table(features)
+    if "error" in df.columns:
+        df = df[df["error"].isna()]
+    if labels is not None:
+        df = df.drop(columns=["label"], errors="ignore").merge(
+            read_table(labels)[["path", "label"]], on="path"
+        )
+    return df.dropna(subset=["label"])
+
+
+def _holdout_accuracy(df: pd.DataFrame, C: float, seed: int = 0) -> float:
+    rng = np.random.default_rng(seed)
+    test = rng.random(len(df)) < 0.2
+    model = train_model(df[~test], df["label"][~test], C=C)
+    return float(np.mean(model.predict(df[test]) == df["label"][test].astype(str).to_numpy()))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Train a MoodFlow classifier.")
+    parser.add_argument("--task", choices=TASKS, required=True)
+    parser.add_argument("--features", type=Path, required=True)
+    parser.add_argument("--labels", type=Path, default=None)
+    parser.add_argument("--out", type=Path, default=None, help="default: models/<task>.npz")
+    parser.add_argument("-C", type=float, default=1.0, help="inverse regularisation strength")
+    args = parser.parse_args(argv)
+
+    df = load_training_table(args.features, args.labels)
+    print(f"{len(df)} labelled rows, features {MODEL_FEATURES}", file=sys.stderr)
+
+    report: Dict[str, Any] = {"rows": len(df)}
+    if len(df) >= 50:
+        report["holdout_accuracy"] = round(_holdout_accuracy(df, args.C), 4)
+
+    model = train_model(df, df["label"], C=args.C)
+    out = args.out or model_path(args.task)
+    model.save(out)
+    report["classes"] = [str(c) for c in model.classes]
+    print(f"saved {out}: {report}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,96 @@
-from typing import List, Dict, Optional
-# from src.recommender.ranker import track_distance
-from src.api.spotify_genres import SPOTIFY_SEED_GENRES  
+from typing import Any, List, Dict, Optional
+
+import numpy as np
+
+from src.api.spotify_genres import SPOTIFY_SEED_GENRES
+from src.recommender.ranker import rank_tracks
+from src.recommender.track_index import TrackIndex, get_track_index
+
+# local neighbours further than this (in standardised feature units) count as a cold area
+MAX_NEIGHBOUR_DISTANCE = 2.0
+
+# candidates scored by the ranker per request
+CANDIDATE_POOL = 200
+
 
 class PlaylistEngine:
-    def __init__(self, sp_user):
+    def __init__(self, sp_user, index: Optional[TrackIndex] = None):
         self.sp = sp_user
+        self.index = index if index is not None else get_track_index()
 
-    def recommend_ranked(self, genre: str, mood: Optional[str] = None, seed_track_ids: Optional[List[str]] = None, limit: int = 10) -> List[Dict]:
+    def recommend_ranked(
+        self,
+        genre: str,
+        mood: Optional[str] = None,
+        seed_track_ids: Optional[List[str]] = None,
+        limit: int = 10,
+        features: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict]:
         """
-        Get track recommendations based on genre or seed track
-        Note: mood parameter is ignored since audio features API is deprecated
+        Get track recommendations based on genre or seed track.
+
+        Candidates come from the local track index when it has something to
+        compare against (the uploaded song's features, or a seed track that
+        is in the index); Spotify search fills in cold areas. The pool is
+        re-ranked by feature distance, mood fit, popularity and recency,
+        with MMR keeping artists and sounds varied.
         """
         genre = genre if genre in SPOTIFY_SEED_GENRES else "pop"
 
-        # Get candidates from Spotify
-        # If user provided a seed track, use that; otherwise use genre
-        tracks = self.sp.recommend_tracks(
-            seed_genres=[genre] if not seed_track_ids else None,
-            seed_tracks=seed_track_ids,
-            limit=limit
+        query = self._query_vector(seed_track_ids, features)
+        candidates = self._local_neighbours(genre, seed_track_ids, query)
+
+        if len(candidates) < limit and self.sp is not None:
+            # Get candidates from Spotify
+            # If user provided a seed track, use that; otherwise use genre
+            tracks = self.sp.recommend_tracks(
+                seed_genres=[genre] if not seed_track_ids else None,
+                seed_tracks=seed_track_ids,
+                limit=CANDIDATE_POOL
+            ) or []
+
+            seen = {item["track"].get("id") for item in candidates}
+            for t in tracks:
+                if t.get("id") not in seen:
+                    seen.add(t.get("id"))
+                    candidates.append({"track": t, "vector": self._indexed_vector(t.get("id"))})
+
+        if self.index is None:
+            return rank_tracks(candidates, limit, mood=mood)
+        return rank_tracks(
+            candidates, limit, query=query, mood=mood, mean=self.index.mean, scale=self.index.scale
         )
 
-        if not tracks:
+    def _query_vector(self, seed_track_ids: Optional[List[str]], features: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if self.index is None:
+            return None
+        if features is not None:
+            return self.index.vector(features)
+        if seed_track_ids:
+            return self._indexed_vector(seed_track_ids[0])
+        return None
+
+    def _indexed_vector(self, track_id: Optional[str]) -> Optional[np.ndarray]:
+        if self.index is None or not track_id:
+            return None
+        pos = self.index.position(track_id)
+        return None if pos is None else np.asarray(self.index.vectors[pos])
+
+    def _local_neighbours(self, genre: str, seed_track_ids: Optional[List[str]], query: Optional[np.ndarray]) -> List[Dict]:
+        if self.index is None or query is None:
             return []
-        
-        # Return simplified format (no audio features or distance scoring)
-        return [{"track": t} for t in tracks]
\ No newline at end of file
+
+        skip = set(seed_track_ids or [])
+        positions, distances = self.index.query(
+            query, k=CANDIDATE_POOL + len(skip), genre=genre if self.index.genres else None
+        )
+
+        candidates: List[Dict] = []
+        for pos, dist in zip(positions, distances):
+            if dist > MAX_NEIGHBOUR_DISTANCE:
+                break
+            track = self.index.track(int(pos))
+            if track.get("id") in skip:
+                continue
+            candidates.append({"track": track, "distance": float(dist), "vector": np.asarray(self.index.vectors[pos])})
+        return candidates
@@ -0,0 +1,166 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.ml.feature_matrix import MODEL_FEATURES
+
+# raw feature targets per mood label (see src.ml.mood_model); neutral has none
+MOOD_TARGETS: Dict[str, Dict[str, float]] = {
+    "happy": {"tempo_bpm": 128.0, "spectral_centroid_mean": 2600.0},
+    "energetic": {"tempo_bpm": 110.0, "spectral_centroid_mean": 3200.0},
+    "sad": {"tempo_bpm": 80.0, "spectral_centroid_mean": 1500.0},
+    "calm": {"tempo_bpm": 95.0, "spectral_centroid_mean": 1600.0},
+}
+
+# relevance = sum of weighted terms, each roughly in [-1, 1]
+RANK_WEIGHTS = {"distance": 1.0, "mood": 0.5, "popularity": 0.3, "recency": 0.2}
+
+# 1.0 ranks by relevance only, lower values trade relevance for variety
+MMR_LAMBDA = 0.7
+
+RECENT_YEARS = ("2024", "2023")
+
+
+def track_distance(query: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    """
+    Euclidean distance from a standardised query vector to every row of
+    vectors; NaN for rows without features.
+    """
+    diff = np.asarray(vectors, dtype=np.float32) - np.asarray(query, dtype=np.float32)
+    return np.sqrt(np.einsum("ij,ij->i", diff, diff))
+
+
+def mood_cost(raw: np.ndarray, mood: Optional[str]) -> np.ndarray:
+    """
+    Mean relative miss of each candidate's raw features against the mood targets.
+    """
+    targets = MOOD_TARGETS.get(mood or "")
+    if not targets:
+        return np.zeros(len(raw), dtype=np.float32)
+    cols = [MODEL_FEATURES.index(name) for name in targets]
+    target = np.array(list(targets.values()), dtype=np.float32)
+    return np.abs(raw[:, cols] / target - 1).mean(axis=1)
+
+
+def relevance(
+    vectors: np.ndarray,
+    popularity: np.ndarray,
+    recent: np.ndarray,
+    query: Optional[np.ndarray] = None,
+    mood: Optional[str] = None,
+    mean: Optional[np.ndarray] = None,
+    scale: Optional[np.ndarray] = None,
+    weights: Dict[str, float] = RANK_WEIGHTS,
+) -> np.ndarray:
+    """
+    One relevance score per candidate, computed over the whole pool at once.
+    Terms a candidate has no data for (no features, unknown popularity)
+    take the pool average, so they neither help nor hurt it.
+    """
+    score = weights["popularity"] * _neutral(popularity / 100.0)
+    score += weights["recency"] * recent.astype(np.float32)
+
+    if query is not None:
+        # distance in standardised units, squashed to [0, 1)
+        d = track_distance(query, vectors)
+        score -= weights["distance"] * _neutral(d / (1.0 + d))
+
+    if mood in MOOD_TARGETS and mean is not None and scale is not None:
+        raw = vectors * scale + mean
+        score -= weights["mood"] * _neutral(np.minimum(mood_cost(raw, mood), 1.0))
+
+    return score
+
+
+def _neutral(term: np.ndarray) -> np.ndarray:
+    term = np.asarray(term, dtype=np.float32)
+    known = ~np.isnan(term)
+    if not known.any():
+        return np.zeros_like(term)
+    return np.where(known, term, term[known].mean())
+
+
+def artist_codes(artists: Sequence[str]) -> np.ndarray:
+    return np.unique(np.asarray(artists, dtype=str), return_inverse=True)[1]
+
+
+def _prepare(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # NaN rows zeroed, squared norms, and which rows have features
+    has = ~np.isnan(vectors).any(axis=1)
+    X = np.where(has[:, None], vectors, 0).astype(np.float32)
+    return X, np.einsum("ij,ij->i", X, X), has
+
+
+def similarity(vectors: np.ndarray, codes: np.ndarray, i: int, prepared=None) -> np.ndarray:
+    """
+    Similarity in [0, 1] of every candidate to candidate i: a Gaussian of
+    feature distance (0 without features), and 1 for tracks by the same
+    artist (codes from artist_codes).
+    """
+    X, sq, has = prepared or _prepare(vectors)
+    row = np.exp(-0.5 * np.maximum(sq + sq[i] - 2 * (X @ X[i]), 0))
+    row = row * has if has[i] else np.zeros_like(row)
+    return np.maximum(row, codes == codes[i])
+
+
+def mmr(scores: np.ndarray, vectors: np.ndarray, codes: np.ndarray, k: int, lam: float = MMR_LAMBDA) -> List[int]:
+    """
+    Maximal marginal relevance: greedily pick the candidate maximising
+    lam * relevance - (1 - lam) * similarity to anything already picked.
+    Only the k picked rows of the similarity matrix are ever computed.
+    """
+    n = len(scores)
+    k = min(k, n)
+    prepared = _prepare(vectors)
+    picked: List[int] = []
+    max_sim = np.zeros(n, dtype=np.float32)
+    gain = lam * scores.astype(np.float32)
+    for _ in range(k):
+        best = int(np.argmax(gain - (1 - lam) * max_sim))
+        picked.append(best)
+        gain[best] = -np.inf
+        np.maximum(max_sim, similarity(vectors, codes, best, prepared), out=max_sim)
+    return picked
+
+
+def rank_tracks(
+    candidates: List[Dict[str, Any]],
+    limit: int,
+    query: Optional[np.ndarray] = None,
+    mood: Optional[str] = None,
+    mean: Optional[np.ndarray] = None,
+    scale: Optional[np.ndarray] = None,
+    lam: float = MMR_LAMBDA,
+) -> List[Dict[str, Any]]:
+    """
+    Re-rank {"track": ..., "vector": ...} items (vector standardised, or None)
+    and return the best `limit`, each with its "score".
+    """
+    if not candidates:
+        return []
+
+    tracks = [item["track"] for item in candidates]
+    given = [item.get("vector") for item in candidates]
+    known = [i for i, v in enumerate(given) if v is not None]
+
+    vectors = np.full((len(candidates), len(MODEL_FEATURES)), np.nan, dtype=np.float32)
+    if known:
+        vectors[known] = np.stack([given[i] for i in known])
+    popularity = np.array([t.get("popularity", np.nan) for t in tracks], dtype=np.float32)
+    recent = np.array([str(t.get("album", {}).get("release_date", "")).startswith(RECENT_YEARS) for t in tracks])
+    artists = [_artist_key(t, i) for i, t in enumerate(tracks)]
+
+    scores = relevance(vectors, popularity, recent, query, mood, mean, scale)
+    order = mmr(scores, vectors, artist_codes(artists), limit, lam)
+
+    ranked = []
+    for i in order:
+        item = {k: v for k, v in candidates[i].items() if k != "vector"}
+        item["score"] = float(scores[i])
+        ranked.append(item)
+    return ranked
+
+
+def _artist_key(track: Dict[str, Any], i: int) -> str:
+    first = (track.get("artists") or [{}])[0]
+    return first.get("id") or first.get("name") or f"#{i}"
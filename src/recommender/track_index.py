@@ -0,0 +1,352 @@
+"""
+Local k-nearest-neighbour index over analyzed catalog tracks.
+
+    python -m src.recommender.track_index --features catalog_features.csv --catalog catalog.csv
+
+--features is src.cli.batch_analyze output. --catalog is a CSV keyed by 'path'
+with the Spotify metadata of each file: id, name, artist, and optionally
+genre, image, url, preview_url. The index is written to data/index/
+(MOODFLOW_TRACK_INDEX), where PlaylistEngine picks it up on next start.
+"""
+import argparse
+import heapq
+import json
+import math
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.ml.feature_matrix import MODEL_FEATURES, feature_matrix
+
+INDEX_DIR = Path(os.environ.get("MOODFLOW_TRACK_INDEX", "data/index"))
+INDEX_VERSION = 1
+LEAF_SIZE = 256
+
+
+class TrackIndex:
+    """
+    Static KD-tree over standardised MODEL_FEATURES vectors, one float32 row per track.
+
+    The tree is implicit (heap layout: children of node i are 2i+1 and 2i+2)
+    and vectors are stored in leaf order, so every array is a flat .npy file
+    opened with mmap: loading costs nothing and pages are read on demand.
+    Track metadata lives in tracks.jsonl; only the k matching lines are read.
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        bounds: np.ndarray,
+        ranges: np.ndarray,
+        ids: np.ndarray,
+        genre_codes: np.ndarray,
+        meta: Dict[str, Any],
+        directory: Optional[Path] = None,
+        tracks: Optional[List[Dict[str, Any]]] = None,
+    ):
+        if tuple(meta["features"]) != MODEL_FEATURES:
+            raise ValueError(
+                f"Index was built on features {tuple(meta['features'])}, "
+                f"but the current schema is {MODEL_FEATURES}. Rebuild it."
+            )
+        self.vectors = vectors
+        self.bounds = bounds
+        self.ranges = ranges
+        self.ids = ids
+        self.genre_codes = genre_codes
+        self.genres: List[str] = list(meta["genres"])
+        self.mean = np.asarray(meta["mean"], dtype=np.float32)
+        self.scale = np.asarray(meta["scale"], dtype=np.float32)
+        self.first_leaf = len(ranges) // 2
+        self.directory = directory
+        self._tracks = tracks
+        self._offsets: Optional[np.ndarray] = None
+        self._positions: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    # ---------------------------
+    # Build
+    # ---------------------------
+    @classmethod
+    def build(
+        cls,
+        rows: Any,
+        tracks: Sequence[Dict[str, Any]],
+        genres: Optional[Sequence[Optional[str]]] = None,
+        leaf_size: int = LEAF_SIZE,
+    ) -> "TrackIndex":
+        """
+        rows are feature rows (anything feature_matrix takes), tracks the
+        matching Spotify-style track dicts. Rows with missing features are dropped.
+        """
+        X = feature_matrix(rows)
+        keep = ~np.isnan(X).any(axis=1)
+        X = X[keep]
+        tracks = [t for t, k in zip(tracks, keep) if k]
+        genres = [g for g, k in zip(genres if genres is not None else [None] * len(keep), keep) if k]
+        if len(X) == 0:
+            raise ValueError("No tracks with complete features to index")
+
+        mean = X.mean(axis=0)
+        scale = X.std(axis=0)
+        scale[scale == 0] = 1.0
+        Z = ((X - mean) / scale).astype(np.float32)
+
+        order, bounds, ranges = _build_tree(Z, leaf_size)
+
+        genre_names = sorted({g for g in genres if g})
+        codes = {g: i for i, g in enumerate(genre_names)}
+        meta = {
+            "version": INDEX_VERSION,
+            "features": list(MODEL_FEATURES),
+            "mean": mean.tolist(),
+            "scale": scale.tolist(),
+            "genres": genre_names,
+            "leaf_size": leaf_size,
+        }
+        return cls(
+            vectors=Z[order],
+            bounds=bounds,
+            ranges=ranges,
+            ids=np.array([str(tracks[i].get("id") or "") for i in order]),
+            genre_codes=np.array([codes.get(genres[i], -1) for i in order], dtype=np.int16),
+            meta=meta,
+            tracks=[tracks[i] for i in order],
+        )
+
+    # ---------------------------
+    # Persistence
+    # ---------------------------
+    def save(self, directory: Path = INDEX_DIR) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        tracks = [self.track(i) for i in range(len(self))]
+
+        offsets = [0]
+        with open(directory / "tracks.jsonl", "wb") as f:
+            for t in tracks:
+                line = (json.dumps(t) + "\n").encode()
+                f.write(line)
+                offsets.append(offsets[-1] + len(line))
+
+        np.save(directory / "vectors.npy", np.asarray(self.vectors, dtype=np.float32))
+        np.save(directory / "bounds.npy", np.asarray(self.bounds))
+        np.save(directory / "ranges.npy", np.asarray(self.ranges))
+        np.save(directory / "ids.npy", np.asarray(self.ids))
+        np.save(directory / "genre_codes.npy", np.asarray(self.genre_codes))
+        np.save(directory / "offsets.npy", np.asarray(offsets, dtype=np.int64))
+        meta = {
+            "version": INDEX_VERSION,
+            "features": list(MODEL_FEATURES),
+            "mean": self.mean.tolist(),
+            "scale": self.scale.tolist(),
+            "genres": self.genres,
+            "count": len(self),
+        }
+        # index.json last: its presence marks a complete index
+        tmp = directory / "index.json.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, directory / "index.json")
+
+    @classmethod
+    def load(cls, directory: Path = INDEX_DIR) -> "TrackIndex":
+        directory = Path(directory)
+        meta = json.loads((directory / "index.json").read_text())
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Track index version {meta.get('version')} is not supported. Rebuild it.")
+
+        def arr(name: str) -> np.ndarray:
+            return np.load(directory / f"{name}.npy", mmap_mode="r")
+
+        return cls(
+            vectors=arr("vectors"),
+            bounds=arr("bounds"),
+            ranges=arr("ranges"),
+            ids=arr("ids"),
+            genre_codes=arr("genre_codes"),
+            meta=meta,
+            directory=directory,
+        )
+
+    # ---------------------------
+    # Lookup
+    # ---------------------------
+    def vector(self, features: Dict[str, Any]) -> np.ndarray:
+        """
+        Standardised query vector for an extract_features dict;
+        missing features sit at the catalog mean.
+        """
+        x = feature_matrix([features])[0].astype(np.float32)
+        return np.nan_to_num((x - self.mean) / self.scale, nan=0.0)
+
+    def position(self, track_id: str) -> Optional[int]:
+        if self._positions is None:
+            self._positions = {str(t): i for i, t in enumerate(self.ids.tolist()) if t}
+        return self._positions.get(track_id)
+
+    def track(self, i: int) -> Dict[str, Any]:
+        if self._tracks is not None:
+            return self._tracks[i]
+        if self._offsets is None:
+            self._offsets = np.load(self.directory / "offsets.npy", mmap_mode="r")
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        with open(self.directory / "tracks.jsonl", "rb") as f:
+            f.seek(start)
+            return json.loads(f.read(end - start))
+
+    def query(self, q: np.ndarray, k: int = 10, genre: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (positions, distances) of the k nearest tracks to standardised vector q,
+        nearest first, optionally restricted to one genre.
+        """
+        q = np.asarray(q, dtype=np.float32)
+        code = None
+        if genre is not None:
+            if genre not in self.genres:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            code = self.genres.index(genre)
+
+        best_d = np.empty(0, dtype=np.float32)
+        best_i = np.empty(0, dtype=np.int64)
+        heap = [(0.0, 0)]
+        while heap:
+            d2, node = heapq.heappop(heap)
+            if len(best_d) == k and d2 >= best_d[-1]:
+                break
+
+            start, end = self.ranges[node]
+            if node >= self.first_leaf:
+                idx = np.arange(start, end)
+                if code is not None:
+                    idx = idx[self.genre_codes[start:end] == code]
+                if len(idx) == 0:
+                    continue
+                diff = self.vectors[idx] - q
+                dist = np.einsum("ij,ij->i", diff, diff)
+                best_d = np.concatenate([best_d, dist])
+                best_i = np.concatenate([best_i, idx])
+                top = np.argsort(best_d, kind="stable")[:k]
+                best_d, best_i = best_d[top], best_i[top]
+                continue
+
+            for child in (2 * node + 1, 2 * node + 2):
+                c_start, c_end = self.ranges[child]
+                if c_end > c_start:
+                    lo, hi = self.bounds[child]
+                    gap = np.maximum(np.maximum(lo - q, q - hi), 0)
+                    heapq.heappush(heap, (float(gap @ gap), child))
+
+        return best_i, np.sqrt(best_d)
+
+
+def _build_tree(Z: np.ndarray, leaf_size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Median-split KD-tree in heap layout. Returns the leaf order of the rows,
+    per-node bounding boxes (n_nodes, 2, dims) and row ranges (n_nodes, 2).
+    """
+    n, dims = Z.shape
+    depth = max(0, math.ceil(math.log2(n / leaf_size))) if n > leaf_size else 0
+    n_nodes = 2 ** (depth + 1) - 1
+    first_leaf = n_nodes // 2
+
+    order = np.arange(n)
+    bounds = np.zeros((n_nodes, 2, dims), dtype=np.float32)
+    ranges = np.zeros((n_nodes, 2), dtype=np.int64)
+    ranges[0] = (0, n)
+
+    # parents come before children in heap order
+    for node in range(n_nodes):
+        start, end = ranges[node]
+        if end <= start:
+            continue
+        pts = Z[order[start:end]]
+        bounds[node] = pts.min(axis=0), pts.max(axis=0)
+        if node >= first_leaf:
+            continue
+
+        dim = int(np.argmax(bounds[node, 1] - bounds[node, 0]))
+        mid = (start + end) // 2
+        part = np.argpartition(pts[:, dim], mid - start)
+        order[start:end] = order[start:end][part]
+        ranges[2 * node + 1] = (start, mid)
+        ranges[2 * node + 2] = (mid, end)
+
+    return order, bounds, ranges
+
+
+def catalog_track(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Spotify-style track dict (the shape PlaylistEngine returns) from a catalog CSV row.
+    """
+    def value(name: str) -> Optional[str]:
+        v = row.get(name)
+        return None if v is None or (isinstance(v, float) and math.isnan(v)) else str(v)
+
+    track_id = value("id") or value("spotify_id")
+    url = value("url") or (f"https://open.spotify.com/track/{track_id}" if track_id else None)
+    image = value("image")
+    return {
+        "id": track_id,
+        "name": value("name") or Path(str(row.get("path", ""))).stem,
+        "artists": [{"name": value("artist") or "Unknown"}],
+        "album": {"images": [{"url": image}] if image else []},
+        "external_urls": {"spotify": url} if url else {},
+        "preview_url": value("preview_url"),
+    }
+
+
+_track_index: Optional[TrackIndex] = None
+_track_index_loaded = False
+_track_index_lock = threading.Lock()
+
+
+def get_track_index() -> Optional[TrackIndex]:
+    """
+    Process-wide index, or None when none has been built.
+    """
+    global _track_index, _track_index_loaded
+    with _track_index_lock:
+        if not _track_index_loaded:
+            _track_index_loaded = True
+            if (INDEX_DIR / "index.json").exists():
+                try:
+                    _track_index = TrackIndex.load(INDEX_DIR)
+                except (OSError, ValueError) as e:
+                    print(f"Could not load track index from {INDEX_DIR}: {e}")
+        return _track_index
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import pandas as pd
+
+    from src.ml.train import read_table
+
+    parser = argparse.ArgumentParser(description="Build the local MoodFlow track index.")
+    parser.add_argument("--features", type=Path, required=True, help="batch_analyze output (CSV or Parquet directory)")
+    parser.add_argument("--catalog", type=Path, required=True, help="CSV with path, id, name, artist[, genre, image, url]")
+    parser.add_argument("--out", type=Path, default=INDEX_DIR)
+    parser.add_argument("--leaf-size", type=int, default=LEAF_SIZE)
+    args = parser.parse_args(argv)
+
+    df = read_table(args.features)
+    if "error" in df.columns:
+        df = df[df["error"].isna()]
+    catalog = pd.read_csv(args.catalog)
+    df = df.drop(columns=["genre"], errors="ignore").merge(catalog, on="path")
+
+    records = df.to_dict("records")
+    genres = df["genre"].where(df["genre"].notna(), None).tolist() if "genre" in df.columns else None
+    index = TrackIndex.build(df, [catalog_track(r) for r in records], genres, leaf_size=args.leaf_size)
+    index.save(args.out)
+    print(f"indexed {len(index)} tracks into {args.out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 import streamlit as st
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from src.audio.analyze import analyze_audio
 from src.ml.mood_model import predict_mood
@@ -9,7 +9,9 @@ from src.api.spotify_user_client import SpotifyUserClient
 from src.api.spotify_client_public import SpotifyClientPublic
 from src.api.spotify_genres import SPOTIFY_SEED_GENRES, GENRE_MAP
 
+from src.recommender.genre_strategies import GENRE_SEED_ARTISTS, ARTIST_FOCUSED_GENRES
 from src.recommender.playlist_engine import PlaylistEngine
+from src.ui.pipeline import StageGraph
 
 
 def normalize_spotify_genre(raw: str) -> str:
@@ -17,6 +19,321 @@ def normalize_spotify_genre(raw: str) -> str:
     return g if g in SPOTIFY_SEED_GENRES else "pop"
 
 
+# ---------------------------
+# Stages (data only, no rendering)
+# ---------------------------
+def connect_user(use_login: bool) -> Optional[Dict[str, Any]]:
+    if not use_login:
+        return None
+    client = SpotifyUserClient()
+    user = client.me()
+    return {"client": client, "display_name": user.get('display_name', 'Spotify User')}
+
+
+def extract_features(upload) -> Dict[str, Any]:
+    return analyze_audio(upload)
+
+
+def predict(features: Dict[str, Any]) -> Dict[str, str]:
+    raw_genre = predict_genre(features)
+    return {
+        "mood": predict_mood(features),
+        "raw_genre": raw_genre,
+        "genre": normalize_spotify_genre(raw_genre),
+    }
+
+
+def match_seed(public: SpotifyClientPublic, filename: str) -> Optional[Dict[str, str]]:
+    """
+    Look the uploaded file name up on Spotify to use the song as a seed.
+    """
+    try:
+        search_results = public.sp.search(q=filename, type='track', limit=1)
+    except Exception as e:
+        print(f"Spotify track lookup failed: {e}")
+        return None
+
+    if search_results and search_results.get('tracks', {}).get('items'):
+        found_track = search_results['tracks']['items'][0]
+        return {
+            "track_id": found_track['id'],
+            "track_name": f"{found_track['name']} by {found_track['artists'][0]['name']}",
+            "artist_name": found_track['artists'][0]['name'],
+            "artist_id": found_track['artists'][0]['id'],
+        }
+    return None
+
+
+def fetch_related(public: SpotifyClientPublic, seed: Optional[Dict[str, str]]) -> List[Dict[str, Any]]:
+    if not seed:
+        return []
+    try:
+        related = public.sp.artist_related_artists(seed["artist_id"])
+    except Exception as e:
+        print(f"Could not get related artists: {e}")
+        return []
+    return (related or {}).get('artists', [])
+
+
+def _image(images: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+    return images[0]['url'] if images else None
+
+
+def _track_card(t: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title": t['name'],
+        "artist": t['artists'][0]['name'],
+        "image": _image(t.get('album', {}).get('images')),
+        "url": t.get('external_urls', {}).get('spotify'),
+    }
+
+
+def _search_items(public: SpotifyClientPublic, kind: str, queries: List[str], limit: int) -> List[Dict[str, Any]]:
+    items: List[Dict[str, Any]] = []
+    for q in queries:
+        try:
+            results = public.sp.search(q=q, type=kind, limit=limit)
+            if results and f"{kind}s" in results:
+                items.extend(i for i in results[f"{kind}s"]['items'] if i)
+        except Exception as e:
+            print(f"Spotify search failed: {e}")
+    return items
+
+
+def seed_artists(public: SpotifyClientPublic, seed, related) -> Optional[Dict[str, Any]]:
+    """
+    The uploaded song's artist and its related artists; independent of genre.
+    """
+    if not (seed and related):
+        return None
+    try:
+        original = public.sp.artist(seed["artist_id"])
+        first = {"name": original['name'], "image": _image(original.get('images')), "seed": True}
+    except Exception as e:
+        print(f"Spotify artist lookup failed: {e}")
+        first = {"name": seed["artist_name"], "image": None, "seed": True}
+    artists = [first] + [{"name": a['name'], "image": _image(a.get('images'))} for a in related[:5]]
+    return {"caption": None, "artists": artists}
+
+
+def top_artists(public: SpotifyClientPublic, genre: str, seed, seed_artists) -> Dict[str, Any]:
+    # popular artists in the genre when the uploaded song gave us none
+    if seed_artists:
+        return seed_artists
+
+    caption = "Showing popular artists in this genre" if seed else None
+    if genre in ARTIST_FOCUSED_GENRES:
+        names = GENRE_SEED_ARTISTS.get(genre, [])[:6]
+        if seed:
+            return {"caption": caption, "artists": [{"name": n, "image": None} for n in names]}
+
+        artists = []
+        for artist_name in names:
+            found = _search_items(public, 'artist', [f"artist:{artist_name}"], limit=1)
+            if found:
+                artists.append({"name": found[0]['name'], "image": _image(found[0].get('images'))})
+            else:
+                artists.append({"name": artist_name, "image": None})
+        return {"caption": caption, "artists": artists}
+
+    artists = [
+        {"name": a.get('name', 'Unknown'), "image": a.get('image')}
+        for a in public.get_artists_from_genre(genre, limit=6)
+    ]
+    return {"caption": caption, "artists": artists}
+
+
+def seed_tracks(public: SpotifyClientPublic, seed, related) -> List[Dict[str, Any]]:
+    """
+    Tracks by the uploaded song's artist and its closest related artists.
+    """
+    if not seed:
+        return []
+    names = [seed["artist_name"]] + [a['name'] for a in related[:3]]
+    tracks = _search_items(public, 'track', [f'artist:"{n}"' for n in names], limit=2)
+    if not tracks:
+        print("Could not get artist tracks: no tracks found")
+    return [_track_card(t) for t in tracks[:8]]
+
+
+def genre_tracks(public: SpotifyClientPublic, genre: str, seed_tracks) -> List[Dict[str, Any]]:
+    if seed_tracks:
+        return seed_tracks
+
+    if genre in ARTIST_FOCUSED_GENRES:
+        names = GENRE_SEED_ARTISTS.get(genre, [])[:3]
+        tracks = _search_items(public, 'track', [f'artist:"{n}" year:2023-2024' for n in names], limit=3)
+        return [_track_card(t) for t in tracks[:8]]
+
+    return [
+        {"title": t.get('title', 'Unknown'), "artist": t.get('artist', 'Unknown'), "image": t.get('cover'), "url": t.get('url')}
+        for t in public.get_tracks_from_genre(genre, limit=8)
+    ]
+
+
+def genre_albums(public: SpotifyClientPublic, genre: str) -> List[Dict[str, Any]]:
+    if genre in ARTIST_FOCUSED_GENRES:
+        names = GENRE_SEED_ARTISTS.get(genre, [])[:4]
+        albums = _search_items(public, 'album', [f'artist:"{n}"' for n in names], limit=2)
+        return [
+            {
+                "name": a['name'],
+                "artist": a['artists'][0]['name'] if a.get('artists') else None,
+                "image": _image(a.get('images')),
+                "release_date": a.get('release_date'),
+                "total_tracks": a.get('total_tracks'),
+                "url": a.get('external_urls', {}).get('spotify'),
+            }
+            for a in albums[:8]
+        ]
+    return public.get_albums_from_genre(genre, limit=8)
+
+
+def rank_playlist(user: Optional[Dict[str, Any]], genre: str, predictions: Dict[str, str], features: Dict[str, Any]) -> List[Dict]:
+    if user is None:
+        return []
+    engine = PlaylistEngine(user["client"])
+    return engine.recommend_ranked(
+        genre=genre,
+        mood=predictions["mood"],
+        limit=10,
+        features=features,
+    )
+
+
+def build_graph(memo) -> StageGraph:
+    """
+    decode/features -> predictions -> seed match -> candidates -> render.
+    Rendering happens in main() on every rerun; everything else is memoized.
+    """
+    graph = StageGraph(memo)
+    graph.add("user", connect_user, inputs=("use_login",))
+    graph.add("features", extract_features, inputs=("upload",))
+    graph.add("predictions", predict, deps=("features",))
+    graph.add("seed", match_seed, inputs=("public", "filename"))
+    graph.add("related", fetch_related, deps=("seed",), inputs=("public",))
+    graph.add("seed_artists", seed_artists, deps=("seed", "related"), inputs=("public",))
+    graph.add("seed_tracks", seed_tracks, deps=("seed", "related"), inputs=("public",))
+    graph.add("top_artists", top_artists, deps=("seed", "seed_artists"), inputs=("public", "genre"))
+    graph.add("tracks", genre_tracks, deps=("seed_tracks",), inputs=("public", "genre"))
+    graph.add("albums", genre_albums, inputs=("public", "genre"))
+    graph.add("playlist", rank_playlist, deps=("user", "predictions", "features"), inputs=("genre",))
+    return graph
+
+
+def _session_memo() -> Dict[str, Any]:
+    if "moodflow_memo" not in st.session_state:
+        st.session_state["moodflow_memo"] = {}
+    return st.session_state["moodflow_memo"]
+
+
+def _public_client() -> SpotifyClientPublic:
+    if "moodflow_public" not in st.session_state:
+        st.session_state["moodflow_public"] = SpotifyClientPublic()
+    return st.session_state["moodflow_public"]
+
+
+# ---------------------------
+# Rendering
+# ---------------------------
+def render_artists(section: Dict[str, Any]):
+    if section["caption"]:
+        st.caption(section["caption"])
+    for a in section["artists"]:
+        st.markdown(f"**{a['name']}** ⭐ (Your song)" if a.get("seed") else f"**{a['name']}**")
+        if a.get("image"):
+            st.image(a["image"], width=100)
+
+
+def render_tracks(tracks: List[Dict[str, Any]]):
+    for t in tracks:
+        st.markdown(f"**{t['title']}** by {t['artist']}")
+        if t.get('image'):
+            st.image(t['image'], width=100)
+        if t.get('url'):
+            st.markdown(f"[Open on Spotify]({t['url']})")
+
+
+def render_albums(albums: List[Dict[str, Any]]):
+    if not albums:
+        st.info("No albums found for this genre.")
+        return
+
+    for album in albums:
+        col1, col2 = st.columns([1, 3])
+
+        with col1:
+            if album.get("image"):
+                st.image(album["image"], width=120)
+
+        with col2:
+            st.markdown(f"**{album['name']}**")
+            if album.get("artist"):
+                st.caption(f"by {album['artist']}")
+
+            if album.get("release_date"):
+                st.caption(f"Released: {album['release_date']}")
+
+            if album.get("total_tracks"):
+                st.caption(f"{album['total_tracks']} tracks")
+
+            if album.get("url"):
+                st.markdown(f"[Open on Spotify]({album['url']})")
+
+        st.divider()
+
+
+def render_playlist(sp_user: SpotifyUserClient, ranked: List[Dict], mood: str, genre: str):
+    if not ranked:
+        st.warning("No recommendations returned.")
+        return
+
+    for item in ranked:
+        track = item["track"]
+
+        # Display track info
+        col1, col2 = st.columns([1, 4])
+
+        with col1:
+            if track.get("album", {}).get("images"):
+                st.image(track["album"]["images"][0]["url"], width=80)
+
+        with col2:
+            st.markdown(f"**{track['name']}**")
+            st.caption(f"by {track['artists'][0]['name']}")
+
+            if track.get("preview_url"):
+                st.audio(track["preview_url"])
+
+            if track.get("external_urls", {}).get("spotify"):
+                st.markdown(f"[Open on Spotify]({track['external_urls']['spotify']})")
+
+        st.divider()
+
+    if st.button("Save this playlist to my Spotify"):
+        uris = [
+            f"spotify:track:{item['track']['id']}"
+            for item in ranked
+            if item["track"].get("id")
+        ]
+
+        playlist = sp_user.create_playlist(
+            name=f"MoodFlow — {mood.title()} {genre.title()}",
+            description="Generated by MoodFlow AI based on genre",
+            public=False
+        )
+
+        sp_user.add_tracks_to_playlist(
+            playlist_id=playlist["id"],
+            uris=uris
+        )
+
+        st.success("Playlist saved to your Spotify 🎉")
+        st.markdown(
+            f"[Open playlist on Spotify]({playlist['external_urls']['spotify']})"
+        )
+
+
 def main():
     st.set_page_config(
         page_title="MoodFlow AI",
@@ -26,6 +343,10 @@ def main():
 
     st.title("🎧 MoodFlow AI — Music Intelligence Assistant")
 
+    graph = build_graph(_session_memo())
+    sp_public = _public_client()
+    graph.set_input("public", sp_public, key="public")
+
     # ---------------------------
     # Sidebar: Spotify Login
     # ---------------------------
@@ -36,18 +357,17 @@ def main():
             "Login for personalized recommendations",
             value=True
         )
+        graph.set_input("use_login", use_login)
 
-        sp_user: Optional[SpotifyUserClient] = None
-        sp_public = SpotifyClientPublic()
-
+        user: Optional[Dict[str, Any]] = None
         if use_login:
             try:
-                client = SpotifyUserClient()
-                user = client.me()
-                sp_user = client
-                st.success(f"Connected as {user.get('display_name', 'Spotify User')} ✅")
-            except Exception:
+                user = graph.get("user")
+                st.success(f"Connected as {user['display_name']} ✅")
+            except Exception as e:
+                print(f"Spotify login failed: {e}")
                 st.warning("Spotify login not completed. Using guest mode.")
+                graph.set_input("use_login", False)
         else:
             st.info("Guest mode enabled.")
 
@@ -65,54 +385,40 @@ def main():
 
     st.audio(uploaded)
 
+    upload_key = getattr(uploaded, "file_id", None) or (uploaded.name, uploaded.size)
+    graph.set_input("upload", uploaded, key=upload_key)
+    # Extract filename without extension as a search query
+    graph.set_input("filename", uploaded.name.rsplit('.', 1)[0])
+
     # ---------------------------
     # Analyze audio
     # ---------------------------
     with st.spinner("Analyzing audio..."):
-        user_features = analyze_audio(uploaded)
+        user_features = graph.get("features")
+
+    predictions = graph.get("predictions")
+    mood, raw_genre = predictions["mood"], predictions["raw_genre"]
+    genre = predictions["genre"]
 
-    mood = predict_mood(user_features)
-    raw_genre = predict_genre(user_features)
-    genre = normalize_spotify_genre(raw_genre)
-    
     # Let user override the predicted genre
     st.info(f"🤖 AI predicted: **{raw_genre}** (mapped to **{genre}**)")
-    
+
     # Show genre selector
     all_genres = sorted(list(SPOTIFY_SEED_GENRES))
     genre_index = all_genres.index(genre) if genre in all_genres else 0
-    
-    selected_genre = st.selectbox(
+
+    genre = st.selectbox(
         "Adjust genre if needed:",
         options=all_genres,
         index=genre_index
     )
-    
-    # Use the selected genre instead
-    genre = selected_genre
-    
-    # Try to find this song on Spotify to use as a seed
-    seed_track_id = None
-    uploaded_track_name = None
-    uploaded_artist_name = None
-    uploaded_artist_id = None
-    
-    # Extract filename without extension as a search query
-    filename = uploaded.name.rsplit('.', 1)[0]
-    
-    try:
-        # Search Spotify for this song
-        search_results = sp_public.sp.search(q=filename, type='track', limit=1)
-        if search_results and search_results.get('tracks', {}).get('items'):
-            found_track = search_results['tracks']['items'][0]
-            seed_track_id = found_track['id']
-            uploaded_track_name = f"{found_track['name']} by {found_track['artists'][0]['name']}"
-            uploaded_artist_name = found_track['artists'][0]['name']
-            uploaded_artist_id = found_track['artists'][0]['id']
-            st.info(f"🎵 Found match on Spotify: {uploaded_track_name}")
-    except:
-        st.caption("Could not find this song on Spotify, using genre-based recommendations")
+    graph.set_input("genre", genre)
 
+    seed = graph.get("seed")
+    if seed:
+        st.info(f"🎵 Found match on Spotify: {seed['track_name']}")
+    else:
+        st.caption("Could not find this song on Spotify, using genre-based recommendations")
 
     # ---------------------------
     # Top layout
@@ -129,71 +435,7 @@ def main():
 
     with colB:
         st.markdown("### Top Artists")
-        
-        # If we found the uploaded song, show RELATED artists to that specific artist
-        if uploaded_artist_id:
-            try:
-                # Try to get related artists
-                related = sp_public.sp.artist_related_artists(uploaded_artist_id)
-                
-                if related and 'artists' in related and len(related['artists']) > 0:
-                    # Show the original artist + top 5 related
-                    try:
-                        original_artist = sp_public.sp.artist(uploaded_artist_id)
-                        if original_artist:
-                            st.markdown(f"**{original_artist['name']}** ⭐ (Your song)")
-                            if original_artist.get('images'):
-                                st.image(original_artist['images'][0]['url'], width=100)
-                    except:
-                        st.markdown(f"**{uploaded_artist_name}** ⭐ (Your song)")
-                    
-                    for artist in related['artists'][:5]:
-                        st.markdown(f"**{artist['name']}**")
-                        if artist.get('images'):
-                            st.image(artist['images'][0]['url'], width=100)
-                else:
-                    # No related artists found, use genre fallback
-                    raise Exception("No related artists")
-                    
-            except Exception as e:
-                print(f"Could not get related artists: {e}")
-                # Fallback to curated list
-                from src.recommender.genre_strategies import GENRE_SEED_ARTISTS, ARTIST_FOCUSED_GENRES
-                
-                st.caption("Showing popular artists in this genre")
-                
-                if genre in ARTIST_FOCUSED_GENRES:
-                    seed_artists = GENRE_SEED_ARTISTS.get(genre, [])[:6]
-                    for artist_name in seed_artists:
-                        st.markdown(f"**{artist_name}**")
-                else:
-                    artists = sp_public.get_artists_from_genre(genre, limit=6)
-                    for a in artists:
-                        st.markdown(f"**{a.get('name', 'Unknown')}**")
-                        if a.get('image'):
-                            st.image(a['image'], width=100)
-        else:
-            # No uploaded song found - use curated lists
-            from src.recommender.genre_strategies import GENRE_SEED_ARTISTS, ARTIST_FOCUSED_GENRES
-            
-            if genre in ARTIST_FOCUSED_GENRES:
-                seed_artists = GENRE_SEED_ARTISTS.get(genre, [])[:6]
-                for artist_name in seed_artists:
-                    try:
-                        results = sp_public.sp.search(q=f"artist:{artist_name}", type='artist', limit=1)
-                        if results and 'artists' in results and results['artists']['items']:
-                            artist = results['artists']['items'][0]
-                            st.markdown(f"**{artist['name']}**")
-                            if artist.get('images'):
-                                st.image(artist['images'][0]['url'], width=100)
-                    except:
-                        st.markdown(f"**{artist_name}**")
-            else:
-                artists = sp_public.get_artists_from_genre(genre, limit=6)
-                for a in artists:
-                    st.markdown(f"**{a.get('name', 'Unknown')}**")
-                    if a.get('image'):
-                        st.image(a['image'], width=100)
+        render_artists(graph.get("top_artists"))
 
     st.divider()
 
@@ -204,119 +446,9 @@ def main():
         ["Tracks", "Playlist Builder", "Albums"]
     )
 
-    # ---------------------------
-    # Tracks (public)
-    # ---------------------------
     with tab1:
         st.markdown("### Tracks in this genre")
-        
-        # If we have the uploaded artist, show their tracks + related artists' tracks
-        if uploaded_artist_id:
-            all_genre_tracks = []
-            
-            try:
-                # Get related artists
-                related = sp_public.sp.artist_related_artists(uploaded_artist_id)
-                artists_to_show = [uploaded_artist_name]
-                
-                if related and 'artists' in related and len(related['artists']) > 0:
-                    artists_to_show.extend([a['name'] for a in related['artists'][:3]])
-                
-                # Get recent tracks from these artists
-                for artist_name in artists_to_show:
-                    try:
-                        results = sp_public.sp.search(
-                            q=f'artist:"{artist_name}"', 
-                            type='track', 
-                            limit=2
-                        )
-                        if results and 'tracks' in results:
-                            all_genre_tracks.extend(results['tracks']['items'])
-                    except:
-                        continue
-                
-                # Display tracks
-                if len(all_genre_tracks) > 0:
-                    for t in all_genre_tracks[:8]:
-                        if t:
-                            st.markdown(f"**{t['name']}** by {t['artists'][0]['name']}")
-                            if t.get('album', {}).get('images'):
-                                st.image(t['album']['images'][0]['url'], width=100)
-                            if t.get('external_urls', {}).get('spotify'):
-                                st.markdown(f"[Open on Spotify]({t['external_urls']['spotify']})")
-                else:
-                    raise Exception("No tracks found")
-                    
-            except Exception as e:
-                print(f"Could not get artist tracks: {e}")
-                # Fallback to standard search
-                from src.recommender.genre_strategies import GENRE_SEED_ARTISTS, ARTIST_FOCUSED_GENRES
-                
-                if genre in ARTIST_FOCUSED_GENRES:
-                    seed_artists_for_tracks = GENRE_SEED_ARTISTS.get(genre, [])[:3]
-                    all_genre_tracks = []
-                    
-                    for artist_name in seed_artists_for_tracks:
-                        try:
-                            results = sp_public.sp.search(
-                                q=f'artist:"{artist_name}" year:2023-2024', 
-                                type='track', 
-                                limit=3
-                            )
-                            if results and 'tracks' in results:
-                                all_genre_tracks.extend(results['tracks']['items'])
-                        except:
-                            continue
-                    
-                    for t in all_genre_tracks[:8]:
-                        if t:
-                            st.markdown(f"**{t['name']}** by {t['artists'][0]['name']}")
-                            if t.get('album', {}).get('images'):
-                                st.image(t['album']['images'][0]['url'], width=100)
-                            if t.get('external_urls', {}).get('spotify'):
-                                st.markdown(f"[Open on Spotify]({t['external_urls']['spotify']})")
-                else:
-                    tracks = sp_public.get_tracks_from_genre(genre, limit=8)
-                    for t in tracks:
-                        st.markdown(f"**{t.get('title', 'Unknown')}** by {t.get('artist', 'Unknown')}")
-                        if t.get('cover'):
-                            st.image(t['cover'], width=100)
-                        if t.get('url'):
-                            st.markdown(f"[Open on Spotify]({t['url']})")
-        
-        # For artist-focused genres without uploaded song, use curated artists
-        elif genre in ARTIST_FOCUSED_GENRES:
-            seed_artists_for_tracks = GENRE_SEED_ARTISTS.get(genre, [])[:3]
-            all_genre_tracks = []
-            
-            for artist_name in seed_artists_for_tracks:
-                try:
-                    results = sp_public.sp.search(
-                        q=f'artist:"{artist_name}" year:2023-2024', 
-                        type='track', 
-                        limit=3
-                    )
-                    if results and 'tracks' in results:
-                        all_genre_tracks.extend(results['tracks']['items'])
-                except:
-                    continue
-            
-            for t in all_genre_tracks[:8]:
-                if t:
-                    st.markdown(f"**{t['name']}** by {t['artists'][0]['name']}")
-                    if t.get('album', {}).get('images'):
-                        st.image(t['album']['images'][0]['url'], width=100)
-                    if t.get('external_urls', {}).get('spotify'):
-                        st.markdown(f"[Open on Spotify]({t['external_urls']['spotify']})")
-        else:
-            # Standard search for other genres
-            tracks = sp_public.get_tracks_from_genre(genre, limit=8)
-            for t in tracks:
-                st.markdown(f"**{t.get('title', 'Unknown')}** by {t.get('artist', 'Unknown')}")
-                if t.get('cover'):
-                    st.image(t['cover'], width=100)
-                if t.get('url'):
-                    st.markdown(f"[Open on Spotify]({t['url']})")
+        render_tracks(graph.get("tracks"))
 
     # ---------------------------
     # Playlist Builder (OAuth)
@@ -325,64 +457,10 @@ def main():
         st.markdown("### MoodFlow Playlist Builder")
         st.caption("Genre-based recommendations from Spotify")
 
-        if sp_user is None:
+        if user is None:
             st.error("Spotify authentication required.")
-            st.stop()
-
-        engine = PlaylistEngine(sp_user)
-        ranked = engine.recommend_ranked(
-            genre=genre,
-            mood=mood,  # Note: mood is ignored in simplified version
-            limit=10
-        )
-
-        if not ranked:
-            st.warning("No recommendations returned.")
         else:
-            for item in ranked:
-                track = item["track"]
-
-                # Display track info
-                col1, col2 = st.columns([1, 4])
-                
-                with col1:
-                    if track.get("album", {}).get("images"):
-                        st.image(track["album"]["images"][0]["url"], width=80)
-                
-                with col2:
-                    st.markdown(f"**{track['name']}**")
-                    st.caption(f"by {track['artists'][0]['name']}")
-                    
-                    if track.get("preview_url"):
-                        st.audio(track["preview_url"])
-                    
-                    if track.get("external_urls", {}).get("spotify"):
-                        st.markdown(f"[Open on Spotify]({track['external_urls']['spotify']})")
-                
-                st.divider()
-
-            if st.button("Save this playlist to my Spotify"):
-                uris = [
-                    f"spotify:track:{item['track']['id']}"
-                    for item in ranked
-                    if item["track"].get("id")
-                ]
-
-                playlist = sp_user.create_playlist(
-                    name=f"MoodFlow — {mood.title()} {genre.title()}",
-                    description="Generated by MoodFlow AI based on genre",
-                    public=False
-                )
-
-                sp_user.add_tracks_to_playlist(
-                    playlist_id=playlist["id"],
-                    uris=uris
-                )
-
-                st.success("Playlist saved to your Spotify 🎉")
-                st.markdown(
-                    f"[Open playlist on Spotify]({playlist['external_urls']['spotify']})"
-                )
+            render_playlist(user["client"], graph.get("playlist"), mood, genre)
 
     # ---------------------------
     # Albums
@@ -390,77 +468,8 @@ def main():
     with tab3:
         st.markdown("### Recommended Albums")
         st.caption(f"Popular {genre} albums you might enjoy")
-        
-        # For artist-focused genres, show albums by curated artists
-        if genre in ARTIST_FOCUSED_GENRES:
-            seed_artists_for_albums = GENRE_SEED_ARTISTS.get(genre, [])[:4]
-            all_genre_albums = []
-            
-            for artist_name in seed_artists_for_albums:
-                try:
-                    results = sp_public.sp.search(
-                        q=f'artist:"{artist_name}"', 
-                        type='album', 
-                        limit=2
-                    )
-                    if results and 'albums' in results:
-                        all_genre_albums.extend(results['albums']['items'])
-                except:
-                    continue
-            
-            # Display albums
-            for album in all_genre_albums[:8]:
-                if album:
-                    col1, col2 = st.columns([1, 3])
-                    
-                    with col1:
-                        if album.get('images'):
-                            st.image(album['images'][0]['url'], width=120)
-                    
-                    with col2:
-                        st.markdown(f"**{album['name']}**")
-                        if album.get('artists'):
-                            st.caption(f"by {album['artists'][0]['name']}")
-                        
-                        if album.get('release_date'):
-                            st.caption(f"Released: {album['release_date']}")
-                        
-                        if album.get('total_tracks'):
-                            st.caption(f"{album['total_tracks']} tracks")
-                        
-                        if album.get('external_urls', {}).get('spotify'):
-                            st.markdown(f"[Open on Spotify]({album['external_urls']['spotify']})")
-                    
-                    st.divider()
-        else:
-            # Use standard method for other genres
-            albums = sp_public.get_albums_from_genre(genre, limit=8)
-            
-            if not albums:
-                st.info("No albums found for this genre.")
-            else:
-                for album in albums:
-                    col1, col2 = st.columns([1, 3])
-                    
-                    with col1:
-                        if album.get("image"):
-                            st.image(album["image"], width=120)
-                    
-                    with col2:
-                        st.markdown(f"**{album['name']}**")
-                        st.caption(f"by {album['artist']}")
-                        
-                        if album.get("release_date"):
-                            st.caption(f"Released: {album['release_date']}")
-                        
-                        if album.get("total_tracks"):
-                            st.caption(f"{album['total_tracks']} tracks")
-                        
-                        if album.get("url"):
-                            st.markdown(f"[Open on Spotify]({album['url']})")
-                    
-                    st.divider()
+        render_albums(graph.get("albums"))
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
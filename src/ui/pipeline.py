@@ -0,0 +1,73 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, MutableMapping, Optional, Sequence, Tuple
+
+
+class Stage:
+    def __init__(self, name: str, fn: Callable[..., Any], deps: Sequence[str], inputs: Sequence[str]):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.inputs = tuple(inputs)
+
+
+class StageGraph:
+    """
+    Explicit dependency graph for one Streamlit rerun.
+
+    Inputs are set each run with a hashable key (the value itself by default).
+    A stage's key is built from its inputs' keys and its dependencies' keys,
+    so it is recomputed only when something upstream of it changed; otherwise
+    its result comes from the session memo. The memo keeps the last few
+    results per stage, so flipping a widget back and forth stays cheap.
+    Failed stages are not memoized.
+    """
+
+    def __init__(self, memo: MutableMapping[str, Any], max_entries: int = 4):
+        self._memo = memo
+        self.max_entries = max_entries
+        self._stages: Dict[str, Stage] = {}
+        self._inputs: Dict[str, Tuple[Hashable, Any]] = {}
+        self._keys: Dict[str, Hashable] = {}
+        self.computed: Dict[str, int] = {}
+        self.reused: Dict[str, int] = {}
+
+    def add(self, name: str, fn: Callable[..., Any], deps: Sequence[str] = (), inputs: Sequence[str] = ()) -> None:
+        """
+        fn is called with each dependency's result and each input's value as keyword arguments.
+        """
+        unknown = [d for d in deps if d not in self._stages]
+        if unknown:
+            raise ValueError(f"Stage '{name}' depends on unknown stages {unknown}")
+        self._stages[name] = Stage(name, fn, deps, inputs)
+
+    def set_input(self, name: str, value: Any, key: Optional[Hashable] = None) -> None:
+        self._inputs[name] = (value if key is None else key, value)
+        self._keys.clear()
+
+    def key(self, name: str) -> Hashable:
+        if name not in self._keys:
+            stage = self._stages[name]
+            self._keys[name] = (
+                tuple(self._inputs[i][0] for i in stage.inputs),
+                tuple(self.key(d) for d in stage.deps),
+            )
+        return self._keys[name]
+
+    def get(self, name: str) -> Any:
+        stage = self._stages[name]
+        key = self.key(name)
+        results: "OrderedDict[Hashable, Any]" = self._memo.setdefault(name, OrderedDict())
+        if key in results:
+            results.move_to_end(key)
+            self.reused[name] = self.reused.get(name, 0) + 1
+            return results[key]
+
+        kwargs = {d: self.get(d) for d in stage.deps}
+        kwargs.update((i, self._inputs[i][1]) for i in stage.inputs)
+        value = stage.fn(**kwargs)
+
+        results[key] = value
+        while len(results) > self.max_entries:
+            results.popitem(last=False)
+        self.computed[name] = self.computed.get(name, 0) + 1
+        return value
@@ -1,2 +1,156 @@
+import librosa
+import numpy as np
+
+from src.audio.features import extract_features, spectral_centroid, zero_crossing_rate
+
+SR = 22050
+
+
+def _clip(seconds: float = 5.0) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    n = int(SR * seconds)
+    t = np.arange(n) / SR
+    y = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.05 * rng.standard_normal(n)
+    # clicks every half second give the tempo estimator something to lock on to
+    for i in range(0, n, SR // 2):
+        y[i:i + 800] += rng.standard_normal(len(y[i:i + 800]))
+    return y.astype(np.float32)
+
+
 def test_placeholder() :
-    assert True
\ No newline at end of file
+    assert True
+
+
+def test_extract_features_keys():
+    feats = extract_features(_clip(), SR)
+    assert set(feats) == {"tempo_bpm", "spectral_centroid_mean", "zcr_mean", "mfcc_mean", "mfcc_std"}
+    assert all(isinstance(v, float) for v in feats.values())
+
+
+def test_extract_features_matches_librosa_reference():
+    y = _clip()
+    feats = extract_features(y, SR)
+
+    tempo, _ = librosa.beat.beat_track(y=y, sr=SR)
+    mfcc = librosa.feature.mfcc(y=y, sr=SR, n_mfcc=13)
+
+    assert feats["tempo_bpm"] == float(np.atleast_1d(tempo)[0])
+    assert np.isclose(feats["spectral_centroid_mean"], np.mean(librosa.feature.spectral_centroid(y=y, sr=SR)), rtol=1e-5)
+    assert feats["zcr_mean"] == float(np.mean(librosa.feature.zero_crossing_rate(y)))
+    assert np.isclose(feats["mfcc_mean"], np.mean(mfcc), rtol=1e-5)
+    assert np.isclose(feats["mfcc_std"], np.std(mfcc), rtol=1e-5)
+
+
+def test_frame_helpers_match_librosa():
+    y = _clip(1.3)
+    y[:300] = 0.0
+    magnitude = np.abs(librosa.stft(y))
+
+    assert np.array_equal(zero_crossing_rate(y), librosa.feature.zero_crossing_rate(y)[0])
+    assert np.allclose(spectral_centroid(magnitude, SR), librosa.feature.spectral_centroid(S=magnitude, sr=SR)[0], rtol=1e-4)
+
+
+def test_silence_has_zero_tempo():
+    feats = extract_features(np.zeros(SR * 2, dtype=np.float32), SR)
+    assert feats["tempo_bpm"] == 0.0
+
+
+def _write_wav(path, seconds: float = 2.0):
+    import soundfile as sf
+    sf.write(str(path), _clip(seconds), SR)
+    return path
+
+
+def test_analyze_audio_serves_repeat_uploads_from_cache(tmp_path, monkeypatch):
+    import io
+    import src.audio.analyze as analyze
+    from src.audio.cache import AnalysisCache
+
+    data = _write_wav(tmp_path / "clip.wav").read_bytes()
+    cache = AnalysisCache(directory=tmp_path / "cache")
+
+    first = analyze.analyze_audio(io.BytesIO(data), cache=cache)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached upload was decoded again")
+
+    monkeypatch.setattr(analyze, "load_audio", fail)
+    assert analyze.analyze_audio(io.BytesIO(data), cache=cache) == first
+
+    # a fresh process only has the disk tier
+    cache.clear_memory()
+    assert analyze.analyze_audio(io.BytesIO(data), cache=cache) == first
+
+
+def test_analysis_cache_disk_tier_is_bounded(tmp_path):
+    from src.audio.cache import AnalysisCache, content_key
+
+    cache = AnalysisCache(directory=tmp_path, max_entries=2, max_disk_bytes=400)
+    for i in range(20):
+        cache.put(content_key(bytes([i]), "v"), {"tempo_bpm": float(i), "zcr_mean": 0.1})
+
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.json")) <= 400
+    assert cache.get(content_key(bytes([19]), "v")) == {"tempo_bpm": 19.0, "zcr_mean": 0.1}
+    assert cache.get(content_key(bytes([0]), "v")) is None
+
+
+def test_stream_mode_matches_full_analysis(tmp_path):
+    import soundfile as sf
+    from src.audio.loader import load_audio
+
+    # stereo at a different native rate exercises downmix + streaming resample
+    y = _clip(12.0)
+    path = tmp_path / "long.wav"
+    sf.write(str(path), np.stack([y, 0.5 * y], axis=1), 44100)
+
+    full = extract_features(*load_audio(str(path)))
+    blocks, sr = load_audio(str(path), mode="stream", block_size=4096)
+    streamed = extract_features(blocks, sr)
+
+    assert streamed["tempo_bpm"] == full["tempo_bpm"]
+    for key in ("spectral_centroid_mean", "zcr_mean", "mfcc_mean", "mfcc_std"):
+        assert np.isclose(streamed[key], full[key], rtol=1e-3), key
+
+
+def test_running_stats_matches_numpy():
+    from src.audio.features import RunningStats
+
+    values = np.random.default_rng(3).normal(5.0, 2.0, size=1000)
+    stats = RunningStats()
+    for chunk in np.array_split(values, 7):
+        stats.update(chunk)
+
+    assert np.isclose(stats.mean, values.mean())
+    assert np.isclose(stats.std, values.std())
+
+
+def test_excerpt_mode_decodes_few_windows_with_small_drift(tmp_path):
+    import soundfile as sf
+    from src.audio.analyze import drift_report
+    from src.audio.loader import load_audio
+
+    path = tmp_path / "long.wav"
+    sf.write(str(path), _clip(90.0), SR)
+
+    windows, sr = load_audio(str(path), mode="excerpt")
+    assert sr == SR
+    assert len(windows) == 3
+    assert all(len(w) == 10 * SR for w in windows)
+
+    report = drift_report(str(path), mode="excerpt")
+    assert report["drift"]["tempo_bpm"] == 0.0
+    for key in ("spectral_centroid_mean", "zcr_mean", "mfcc_std"):
+        assert report["drift"][key] < 0.02, key
+    # mfcc_mean sits near zero, so compare it in absolute terms
+    assert abs(report["features"]["mfcc_mean"] - report["reference"]["mfcc_mean"]) < 1.0
+
+
+def test_excerpt_mode_decodes_short_files_whole(tmp_path):
+    import soundfile as sf
+    from src.audio.loader import load_audio
+
+    path = tmp_path / "short.wav"
+    sf.write(str(path), _clip(4.0), SR)
+
+    windows, _ = load_audio(str(path), mode="excerpt")
+    assert len(windows) == 1 and len(windows[0]) == 4 * SR
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import soundfile as sf
+
+from src.cli.batch_analyze import find_audio_files, run_batch
+
+SR = 22050
+
+
+def _write_clips(root, n):
+    rng = np.random.default_rng(0)
+    for i in range(n):
+        sf.write(str(root / f"clip{i}.wav"), 0.1 * rng.standard_normal(SR * 2).astype(np.float32), SR)
+
+
+def test_batch_writes_csv_and_resumes(tmp_path):
+    music = tmp_path / "music"
+    music.mkdir()
+    _write_clips(music, 3)
+    (music / "broken.mp3").write_bytes(b"not audio")
+    out = tmp_path / "moods.csv"
+
+    paths = find_audio_files(music)
+    stats = run_batch(paths, out, workers=2, flush_every=2)
+    assert stats == {"analyzed": 4, "failed": 1, "skipped": 0}
+
+    df = pd.read_csv(out)
+    assert sorted(df["path"]) == sorted(paths)
+    ok = df[df["error"].isna()]
+    assert len(ok) == 3 and ok["mood"].notna().all() and ok["tempo_bpm"].notna().all()
+
+    # a restart only picks up files that are not in the output yet
+    _write_clips(music, 4)
+    stats = run_batch(find_audio_files(music), out, workers=2)
+    assert stats == {"analyzed": 1, "failed": 0, "skipped": 4}
+    assert len(pd.read_csv(out)) == 5
+
+
+def test_batch_parquet_output(tmp_path):
+    _write_clips(tmp_path, 2)
+    out = tmp_path / "moods.parquet"
+
+    run_batch(find_audio_files(tmp_path), out, workers=1, mode="excerpt")
+    df = pd.concat(pd.read_parquet(p) for p in sorted(out.glob("part-*.parquet")))
+    assert len(df) == 2 and df["error"].isna().all()
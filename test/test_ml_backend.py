@@ -0,0 +1,65 @@
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+import src.ml.backend as backend
+from src.ml.feature_matrix import MODEL_FEATURES
+from src.ml.mood_model import predict_mood, predict_mood_batch
+from src.ml.train import train_model
+
+
+def _labelled(n=400):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "tempo_bpm": rng.uniform(60, 180, n),
+        "spectral_centroid_mean": rng.uniform(500, 5000, n),
+        "zcr_mean": rng.uniform(0.01, 0.2, n),
+        "mfcc_mean": rng.normal(0, 10, n),
+        "mfcc_std": rng.uniform(10, 60, n),
+    })
+    labels = np.where(df["tempo_bpm"] > 130, "happy", np.where(df["spectral_centroid_mean"] < 2000, "sad", "calm"))
+    return df, labels
+
+
+def test_exported_model_matches_sklearn():
+    from sklearn.linear_model import LogisticRegression
+
+    df, labels = _labelled()
+    model = train_model(df, labels)
+
+    X = df[list(MODEL_FEATURES)].to_numpy()
+    clf = LogisticRegression(max_iter=1000).fit((X - model.mean) / model.scale, labels)
+    assert np.allclose(model.predict_proba(df), clf.predict_proba((X - model.mean) / model.scale), atol=1e-6)
+    assert np.mean(model.predict(df) == labels) > 0.9
+
+
+def test_binary_model_probabilities():
+    df, labels = _labelled()
+    model = train_model(df, np.where(labels == "happy", "happy", "other"))
+    proba = model.predict_proba(df)
+    assert proba.shape == (len(df), 2) and np.allclose(proba.sum(axis=1), 1.0)
+
+
+def test_trained_artifact_is_picked_up_once(tmp_path, monkeypatch):
+    df, labels = _labelled()
+    train_model(df, labels).save(tmp_path / "mood.npz")
+
+    monkeypatch.setattr(backend, "MODEL_DIR", tmp_path)
+    backend.reset_models()
+    try:
+        row = df.iloc[0].to_dict()
+        assert predict_mood(row) == labels[0]
+        assert list(predict_mood_batch(df.head(20))) == list(backend.get_model("mood").predict(df.head(20)))
+        assert backend.get_model("mood") is backend.get_model("mood")
+        # genre has no artifact, so it stays rule-based
+        assert backend.get_model("genre") is None
+    finally:
+        backend.reset_models()
+
+
+def test_serving_does_not_import_sklearn():
+    code = "import sys; import src.ml.mood_model, src.ml.genre_model; print('sklearn' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
@@ -0,0 +1,89 @@
+import pytest
+
+from src.ui.pipeline import StageGraph
+
+
+def make_graph(memo, calls):
+    def features(upload):
+        calls.append("features")
+        return {"tempo": len(upload)}
+
+    def predictions(features):
+        calls.append("predictions")
+        return "fast" if features["tempo"] > 3 else "slow"
+
+    def candidates(predictions, genre):
+        calls.append("candidates")
+        return f"{predictions}-{genre}"
+
+    graph = StageGraph(memo, max_entries=2)
+    graph.add("features", features, inputs=("upload",))
+    graph.add("predictions", predictions, deps=("features",))
+    graph.add("candidates", candidates, deps=("predictions",), inputs=("genre",))
+    return graph
+
+
+def rerun(memo, calls, upload, genre):
+    # a Streamlit rerun builds a fresh graph over the same session memo
+    graph = make_graph(memo, calls)
+    graph.set_input("upload", upload)
+    graph.set_input("genre", genre)
+    return graph.get("candidates")
+
+
+def test_only_downstream_stages_rerun():
+    memo, calls = {}, []
+    assert rerun(memo, calls, "song", "pop") == "fast-pop"
+    assert calls == ["features", "predictions", "candidates"]
+
+    calls.clear()
+    assert rerun(memo, calls, "song", "pop") == "fast-pop"
+    assert calls == []
+
+    calls.clear()
+    assert rerun(memo, calls, "song", "rock") == "fast-rock"
+    assert calls == ["candidates"]
+
+    calls.clear()
+    assert rerun(memo, calls, "tune", "rock") == "fast-rock"
+    assert calls == ["features", "predictions", "candidates"]
+
+
+def test_memo_keeps_recent_results_per_stage():
+    memo, calls = {}, []
+    for genre in ["pop", "rock", "pop", "jazz", "rock", "pop"]:
+        rerun(memo, calls, "song", genre)
+    assert calls.count("features") == 1
+    # pop is reused once; jazz then evicts rock, rock evicts pop
+    assert calls.count("candidates") == 5
+    assert len(memo["candidates"]) == 2
+
+
+def test_failed_stages_are_not_memoized():
+    memo = {}
+    attempts = []
+
+    def flaky(x):
+        attempts.append(x)
+        if len(attempts) == 1:
+            raise RuntimeError("spotify down")
+        return x
+
+    graph = StageGraph(memo)
+    graph.add("seed", flaky, inputs=("x",))
+    graph.set_input("x", 1)
+    with pytest.raises(RuntimeError):
+        graph.get("seed")
+    assert graph.get("seed") == 1
+    assert graph.get("seed") == 1
+    assert len(attempts) == 2
+
+
+def test_unhashable_inputs_use_explicit_keys():
+    graph = StageGraph({})
+    graph.add("n", lambda upload: len(upload), inputs=("upload",))
+    graph.set_input("upload", [1, 2, 3], key="file-1")
+    assert graph.get("n") == 3
+
+    with pytest.raises(ValueError):
+        graph.add("bad", lambda missing: missing, deps=("missing",))
@@ -0,0 +1,66 @@
+import numpy as np
+
+from src.recommender.ranker import artist_codes, mmr, rank_tracks, relevance, similarity, track_distance
+
+
+def item(track_id, artist, vector=None, popularity=None, release="2015-01-01"):
+    track = {"id": track_id, "artists": [{"id": artist}], "album": {"release_date": release}}
+    if popularity is not None:
+        track["popularity"] = popularity
+    return {"track": track, "vector": None if vector is None else np.asarray(vector, dtype=np.float32)}
+
+
+def test_track_distance_matches_reference():
+    rng = np.random.default_rng(0)
+    q = rng.normal(size=5)
+    X = rng.normal(size=(50, 5))
+    expected = [np.linalg.norm(x - q) for x in X]
+    assert np.allclose(track_distance(q, X), expected, atol=1e-5)
+
+
+def test_closer_tracks_rank_higher_and_missing_features_are_neutral():
+    q = np.zeros(5, dtype=np.float32)
+    ranked = rank_tracks(
+        [item("far", "a", [3, 0, 0, 0, 0]), item("unknown", "b"), item("near", "c", [0.1, 0, 0, 0, 0])],
+        limit=3, query=q, lam=1.0,
+    )
+    assert [r["track"]["id"] for r in ranked] == ["near", "unknown", "far"]
+    assert "vector" not in ranked[0]
+
+
+def test_mood_targets_break_ties():
+    mean = np.array([120, 2000, 0.1, 0, 30], dtype=np.float32)
+    scale = np.array([30, 1000, 0.05, 5, 10], dtype=np.float32)
+    slow = (np.array([80, 1500, 0.1, 0, 30]) - mean) / scale
+    fast = (np.array([130, 2600, 0.1, 0, 30]) - mean) / scale
+
+    vectors = np.stack([slow, fast]).astype(np.float32)
+    no_data = np.full(2, np.nan, dtype=np.float32)
+    recent = np.zeros(2, dtype=bool)
+
+    happy = relevance(vectors, no_data, recent, mood="happy", mean=mean, scale=scale)
+    sad = relevance(vectors, no_data, recent, mood="sad", mean=mean, scale=scale)
+    assert happy[1] > happy[0]
+    assert sad[0] > sad[1]
+
+
+def test_popularity_and_recency_priors():
+    ranked = rank_tracks(
+        [item("old", "a", popularity=90), item("new", "b", popularity=90, release="2024-03-01"), item("obscure", "c", popularity=5)],
+        limit=3, lam=1.0,
+    )
+    assert [r["track"]["id"] for r in ranked] == ["new", "old", "obscure"]
+
+
+def test_mmr_spreads_artists_and_sounds():
+    scores = np.array([1.0, 0.99, 0.9], dtype=np.float32)
+    vectors = np.array([[0, 0], [0, 0.01], [3, 3]], dtype=np.float32)
+    codes = artist_codes(["a", "a", "b"])
+    sim = similarity(vectors, codes, 0)
+    assert sim[1] > 0.99 and sim[2] < 0.01
+    assert similarity(vectors[[0, 2]], artist_codes(["a", "a"]), 0)[1] == 1.0
+
+    assert mmr(scores, vectors, codes, 3, lam=1.0) == [0, 1, 2]
+    assert mmr(scores, vectors, codes, 3, lam=0.7) == [0, 2, 1]
+    assert mmr(scores, vectors, codes, 10) == mmr(scores, vectors, codes, 3)
+    assert mmr(scores[:0], vectors[:0], codes[:0], 5) == []
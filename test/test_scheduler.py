@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+import spotipy
+from spotipy.exceptions import SpotifyException
+
+from src.api.scheduler import (
+    BACKGROUND,
+    RateLimited,
+    RequestScheduler,
+    ScheduledSpotify,
+    request_priority,
+)
+
+
+class Flaky:
+    """Raises the given exceptions in turn, then returns 'ok'."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def too_many_requests(retry_after="0.2"):
+    return SpotifyException(429, -1, "Too Many Requests", headers={"Retry-After": retry_after})
+
+
+def test_token_bucket_paces_calls():
+    scheduler = RequestScheduler(rate=100, burst=1)
+    start = time.monotonic()
+    for _ in range(11):
+        scheduler.call("app", lambda: None)
+    assert time.monotonic() - start >= 0.09
+
+    stats = scheduler.stats()
+    assert stats["calls"] == 11
+    assert stats["throttled_calls"] >= 9
+    assert stats["queue_depth"] == {"interactive": 0, "background": 0}
+
+
+def test_429_honours_retry_after_and_retries():
+    scheduler = RequestScheduler(rate=1000, burst=10)
+    fn = Flaky(too_many_requests("0.2"))
+
+    start = time.monotonic()
+    assert scheduler.call("app", fn) == "ok"
+    assert time.monotonic() - start >= 0.19
+    assert fn.calls == 2
+
+    stats = scheduler.stats()
+    assert stats["rate_limited"] == 1
+    assert stats["retries"] == 1
+
+
+def test_429_pauses_the_whole_credential_only():
+    scheduler = RequestScheduler(rate=1000, burst=10)
+    scheduler._block("app", 0.2)
+    start = time.monotonic()
+    scheduler.call("other-app", lambda: None)
+    assert time.monotonic() - start < 0.1
+    scheduler.call("app", lambda: None)
+    assert time.monotonic() - start >= 0.19
+
+
+def test_long_retry_after_is_rejected_not_queued():
+    scheduler = RequestScheduler(max_wait=0.5)
+    start = time.monotonic()
+    with pytest.raises(RateLimited):
+        scheduler.call("app", Flaky(too_many_requests("3600")))
+    assert time.monotonic() - start < 0.5
+    assert scheduler.stats()["rejected"] == 1
+
+
+def test_client_errors_are_not_retried():
+    scheduler = RequestScheduler()
+    fn = Flaky(SpotifyException(404, -1, "not found"))
+    with pytest.raises(SpotifyException):
+        scheduler.call("app", fn)
+    assert fn.calls == 1
+
+
+def test_interactive_calls_go_before_background():
+    scheduler = RequestScheduler(rate=20, burst=1)
+    scheduler.call("app", lambda: None)          # drain the bucket
+    order = []
+    lock = threading.Lock()
+
+    def run(kind):
+        def record():
+            with lock:
+                order.append(kind)
+
+        if kind == "background":
+            with request_priority(BACKGROUND):
+                scheduler.call("app", record)
+        else:
+            scheduler.call("app", record)
+
+    threads = [threading.Thread(target=run, args=("background",)) for _ in range(3)]
+    for t in threads:
+        t.start()
+    time.sleep(0.01)
+    assert scheduler.queue_depth()["background"] == 3
+
+    interactive = [threading.Thread(target=run, args=("interactive",)) for _ in range(3)]
+    for t in interactive:
+        t.start()
+    for t in threads + interactive:
+        t.join()
+
+    assert order[:3] == ["interactive"] * 3
+
+
+def test_scheduled_spotify_routes_every_request(monkeypatch):
+    upstream = Flaky(too_many_requests("0.05"))
+    monkeypatch.setattr(spotipy.Spotify, "_internal_call", lambda self, method, url, payload, params: upstream())
+
+    scheduler = RequestScheduler()
+    sp = ScheduledSpotify(auth="token", scheduler=scheduler, credential="app")
+    assert sp.track("abc") == "ok"
+    assert sp.me() == "ok"
+    assert scheduler.stats()["calls"] == 3
@@ -1,17 +1,121 @@
-from spotipy.oauth2 import SpotifyClientCredentials
-import spotipy
-from src.secrets.spotify_keys import CLIENT_ID, CLIENT_SECRET
+import time
 
-auth_manager = SpotifyClientCredentials(
-    client_id=CLIENT_ID,
-    client_secret=CLIENT_SECRET
-)
+import pytest
+from spotipy.exceptions import SpotifyException
 
-sp = spotipy.Spotify(auth_manager=auth_manager)
+import src.api.fake_spotify as fake_spotify
+import src.api.response_cache as response_cache
+import src.api.scheduler as scheduler
+from src.api.fake_spotify import FakeSpotify, FakeSpotifyBackend
+from src.api.response_cache import ResponseCache
+from src.api.scheduler import RequestScheduler
+from src.api.spotify_client_public import SpotifyClientPublic
+from src.api.spotify_user_client import SpotifyUserClient
 
-result = sp.search(q="genre:rock", type="track", limit=1)
-print(result)
+
+@pytest.fixture
+def backend(monkeypatch):
+    """
+    Clients built as usual, but answered by a fresh fake backend with
+    fresh process-wide caches and a scheduler that does not throttle.
+    """
+    monkeypatch.setenv("MOODFLOW_SPOTIFY_BACKEND", "fake")
+    monkeypatch.setenv("MOODFLOW_CATALOG_DB", "")
+    fake = FakeSpotifyBackend(seed=7)
+    monkeypatch.setattr(fake_spotify, "_fake_backend", fake)
+    monkeypatch.setattr(response_cache, "_response_cache", ResponseCache())
+    monkeypatch.setattr(scheduler, "_scheduler", RequestScheduler(rate=1000, burst=1000, backoff=0.0))
+    return fake
+
+
+def test_public_client_answers_offline(backend):
+    public = SpotifyClientPublic()
+    artists = public.get_artists_from_genre("k-pop")
+    assert len(artists) == 6
+    assert "BTS" in {a["name"] for a in artists}
+
+    tracks = public.get_tracks_from_genre("rock")
+    assert tracks and all(t["artists"] for t in tracks)
+    assert public.playlists_for_genre("jazz")
+    assert public.get_albums_from_genre("jazz")
+
+    # repeated calls are served by the response cache
+    calls = backend.total_calls()
+    public.get_artists_from_genre("k-pop")
+    assert backend.total_calls() == calls
+
+
+def test_generated_catalog_is_deterministic():
+    a = FakeSpotify(backend=FakeSpotifyBackend(seed=1))
+    b = FakeSpotify(backend=FakeSpotifyBackend(seed=1))
+    c = FakeSpotify(backend=FakeSpotifyBackend(seed=2))
+    assert a.search("genre:rock", limit=10) == b.search("genre:rock", limit=10)
+    assert a.search("genre:rock", limit=10) != c.search("genre:rock", limit=10)
+
+    track = a.search("genre:rock", limit=1)["tracks"]["items"][0]
+    assert a.track(track["id"]) == track
+    assert a.artist_related_artists(track["artists"][0]["id"])["artists"]
+
+    # paging follows absolute "next" URLs like the real API
+    first = a.search("genre:rock", limit=5)["tracks"]
+    assert a.next(first)["items"][0] not in first["items"]
+
+    with pytest.raises(SpotifyException) as e:
+        a.track("does-not-exist")
+    assert e.value.http_status == 404
+
+
+def test_user_recommendations_and_playlists(backend):
+    user = SpotifyUserClient()
+    for genre in ("pop", "k-pop", "chill"):
+        assert user.recommend_tracks(seed_genres=[genre], limit=10)
+
+    seed = user.recommend_tracks(seed_genres=["rock"], limit=1)[0]
+    assert user.recommend_tracks(seed_tracks=[seed["id"]], limit=10)
+
+    playlist = user.create_playlist("MoodFlow test")
+    tracks = user.recommend_tracks(seed_genres=["jazz"], limit=5)
+    user.add_tracks_to_playlist(playlist["id"], [t["uri"] for t in tracks])
+    items = user.sp.playlist_items(playlist["id"])["items"]
+    assert [i["track"]["id"] for i in items] == [t["id"] for t in tracks]
+
+    with pytest.raises(SpotifyException) as e:
+        user.add_tracks_to_playlist(playlist["id"], [tracks[0]["uri"]] * 101)
+    assert e.value.http_status == 400
+
+
+def test_injected_429_is_retried_by_the_scheduler(backend):
+    public = SpotifyClientPublic()
+    backend.inject(429, count=2, retry_after=0.05)
+    start = time.perf_counter()
+    assert public.get_artists_from_genre("rock")
+    assert time.perf_counter() - start >= 0.1
+    assert scheduler.get_scheduler().stats()["rate_limited"] == 2
+
+    backend.inject(503)
+    assert public.get_tracks_from_genre("rock")
+    assert scheduler.get_scheduler().stats()["retries"] >= 1
+
+
+def test_injected_latency_and_errors():
+    sleeps = []
+    backend = FakeSpotifyBackend(latency=0.2, sleep=sleeps.append)
+    sp = FakeSpotify(backend=backend)
+    sp.search("genre:pop")
+    assert sleeps == [0.2]
+    assert backend.calls == {"GET search": 1}
+
+    failing = FakeSpotify(backend=FakeSpotifyBackend(error_rate=1.0))
+    with pytest.raises(SpotifyException) as e:
+        failing.search("genre:pop")
+    assert e.value.http_status == 503
+
+
+def test_recorded_fixtures_override_generated_responses():
+    recorded = {"items": [{"id": "recorded"}]}
+    backend = FakeSpotifyBackend(fixtures={"GET artists/abc/related-artists": recorded})
+    assert FakeSpotify(backend=backend).artist_related_artists("abc") == recorded
 
 
 # def test_placeholder() :
-#     assert True
\ No newline at end of file
+#     assert True
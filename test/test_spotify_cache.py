@@ -0,0 +1,219 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.api.response_cache import CachedSpotify, ResponseCache, SingleFlight, request_key
+
+
+class CountingSpotify:
+    def __init__(self):
+        self.calls = []
+
+    def search(self, q, limit=10, offset=0, type="track", market=None):
+        self.calls.append(("search", q, limit, type, market))
+        return {"tracks": {"items": [{"id": f"{q}-{limit}-{market}"}]}}
+
+    def artist_related_artists(self, artist_id):
+        self.calls.append(("related", artist_id))
+        return {"artists": [{"name": "x"}]}
+
+    def me(self):
+        self.calls.append(("me",))
+        return {"id": "user"}
+
+
+class SlowSpotify(CountingSpotify):
+    """search() blocks until released, so concurrent callers overlap."""
+
+    def __init__(self, error=None):
+        super().__init__()
+        self.release = threading.Event()
+        self.error = error
+
+    def search(self, q, limit=10, offset=0, type="track", market=None):
+        self.release.wait(5)
+        if self.error:
+            self.calls.append(("search", q))
+            raise self.error
+        return super().search(q, limit, offset, type, market)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_request_key_binds_defaults_and_keeps_parameters_apart():
+    assert request_key("search", ("genre:pop",), {}) == request_key("search", (), {"q": "genre:pop", "limit": 10, "type": "track"})
+    assert request_key("search", ("genre:pop",), {"market": "US"}) != request_key("search", ("genre:pop",), {})
+    assert request_key("search", ("genre:pop",), {"limit": 5}) != request_key("search", ("genre:pop",), {})
+    assert request_key("search", ("genre:pop",), {"type": "artist"}) != request_key("search", ("genre:pop",), {})
+    assert request_key("artist", ("spotify:artist:abc",), {}) == request_key("artist", ("https://open.spotify.com/artist/abc?si=1",), {})
+
+
+def test_cached_calls_hit_upstream_once():
+    upstream = CountingSpotify()
+    cache = ResponseCache()
+    sp = CachedSpotify(upstream, cache)
+
+    first = sp.search(q="genre:pop", type="track", limit=5, market="US")
+    assert sp.search("genre:pop", limit=5, type="track", market="US") is first
+    sp.search(q="genre:pop", type="track", limit=5)                 # other market
+    sp.artist_related_artists("abc")
+    sp.artist_related_artists("spotify:artist:abc")
+    sp.me()
+    sp.me()                                                          # not cached
+
+    assert len(upstream.calls) == 5
+    stats = cache.stats()
+    assert stats["hits"] == {"search": 1, "artist_related_artists": 1}
+    assert stats["misses"] == {"search": 2, "artist_related_artists": 1}
+
+
+def test_entries_expire_and_are_bounded():
+    clock = FakeClock()
+    upstream = CountingSpotify()
+    cache = ResponseCache(max_entries=2, ttls={"search": 10}, clock=clock)
+    sp = CachedSpotify(upstream, cache)
+
+    sp.search("a")
+    clock.now = 11
+    sp.search("a")                       # expired -> refetched
+    assert len(upstream.calls) == 2
+
+    sp.search("b")
+    sp.search("c")                       # evicts "a"
+    sp.search("a")
+    assert len(upstream.calls) == 5
+    assert cache.stats()["entries"] == 2
+
+
+def _search_response(q, n=3):
+    return {
+        "tracks": {
+            "href": "h", "total": 100,
+            "items": [{"id": f"{q}{i}", "name": f"{q} {i}", "artists": [{"id": "a1", "name": "A"}]} for i in range(n)],
+        },
+        "playlists": {"items": [None, {"id": "p1", "name": "mix"}]},
+    }
+
+
+def test_catalog_store_round_trips_normalised_records(tmp_path):
+    from src.api.catalog_store import CatalogStore
+
+    store = CatalogStore(tmp_path / "catalog.db")
+    store.put("q1", "search", _search_response("t"), now=100.0)
+    store.put("q2", "artist_related_artists", {"artists": [{"id": "a1", "name": "A"}, {"id": "a2", "name": "B"}]}, now=100.0)
+    store.put("q3", "artist", {"id": "a2", "name": "B", "genres": ["pop"]}, now=100.0)
+
+    assert store.get("q1", now=101.0) == (_search_response("t"), True)
+    assert store.get("q3", now=101.0) == ({"id": "a2", "name": "B", "genres": ["pop"]}, True)
+    # the artist record was updated by the later artist() call
+    assert store.get("q2", now=101.0)[0]["artists"][1]["genres"] == ["pop"]
+    assert store.get("missing") is None
+
+    # a second store on the same file (another worker process) sees everything
+    assert CatalogStore(tmp_path / "catalog.db").get("q1", now=101.0) == (_search_response("t"), True)
+
+
+def test_stale_entries_are_served_then_refreshed_in_background(tmp_path):
+    import time
+    from src.api.catalog_store import CatalogStore
+    from src.api.response_cache import request_key, store_key
+
+    store = CatalogStore(tmp_path / "catalog.db", ttls={"search": 10})
+    key = request_key("search", ("genre:pop",), {})
+    store.put(store_key(key), "search", {"tracks": {"items": [{"id": "old"}]}}, now=time.time() - 60)
+
+    upstream = CountingSpotify()
+    sp = CachedSpotify(upstream, ResponseCache(), store=store)
+
+    # served from disk immediately, although expired
+    assert sp.search("genre:pop")["tracks"]["items"][0]["id"] == "old"
+
+    for _ in range(100):
+        fresh = store.get(store_key(key))
+        if fresh and fresh[1]:
+            break
+        time.sleep(0.02)
+    assert fresh[0]["tracks"]["items"][0]["id"] == "genre:pop-10-None"
+    assert upstream.calls == [("search", "genre:pop", 10, "track", None)]
+
+    # a fresh process reads the refreshed entry without calling Spotify
+    sp2 = CachedSpotify(upstream, ResponseCache(), store=store)
+    assert sp2.search("genre:pop")["tracks"]["items"][0]["id"] == "genre:pop-10-None"
+    assert len(upstream.calls) == 1
+
+
+def test_catalog_store_is_bounded(tmp_path):
+    from src.api.catalog_store import CatalogStore
+
+    store = CatalogStore(tmp_path / "catalog.db", max_bytes=200 * 1024)
+    for i in range(300):
+        store.put(f"q{i}", "search", _search_response(f"x{i}-", n=20), now=float(i))
+    store.evict()
+
+    assert store.size_bytes() <= 200 * 1024
+    assert store.get("q299", now=300.0) is not None
+    assert store.get("q0", now=300.0) is None
+
+
+def _write_many(path, prefix):
+    from src.api.catalog_store import CatalogStore
+
+    store = CatalogStore(path)
+    for i in range(50):
+        store.put(f"{prefix}{i}", "search", _search_response(f"{prefix}{i}-"))
+
+
+def test_catalog_store_tolerates_concurrent_processes(tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+    from src.api.catalog_store import CatalogStore
+
+    path = tmp_path / "catalog.db"
+    CatalogStore(path)
+    with ProcessPoolExecutor(max_workers=3) as pool:
+        list(pool.map(_write_many, [path] * 3, ["a", "b", "c"]))
+
+    store = CatalogStore(path)
+    assert all(store.get(f"{p}{i}") is not None for p in "abc" for i in range(50))
+
+
+def _concurrent_searches(sp, upstream, n=8):
+    flights = sp._flights
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        futures = [pool.submit(sp.search, "genre:pop year:2024", limit=5) for _ in range(n)]
+        while flights.shared < n - 1:
+            threading.Event().wait(0.005)
+        upstream.release.set()
+    return futures
+
+
+def test_concurrent_identical_calls_share_one_request():
+    upstream = SlowSpotify()
+    flights = SingleFlight()
+    sp = CachedSpotify(upstream, ResponseCache(), flights=flights)
+
+    results = [f.result() for f in _concurrent_searches(sp, upstream)]
+
+    assert len(upstream.calls) == 1
+    assert all(r is results[0] for r in results)
+    assert flights.shared == 7
+    assert flights._calls == {}
+
+
+def test_concurrent_callers_share_the_failure():
+    upstream = SlowSpotify(error=RuntimeError("boom"))
+    sp = CachedSpotify(upstream, ResponseCache(), flights=SingleFlight())
+
+    futures = _concurrent_searches(sp, upstream)
+
+    assert all(isinstance(f.exception(), RuntimeError) for f in futures)
+    assert len(upstream.calls) == 1
+
+    # nothing sticks: the next call goes upstream again
+    upstream.error = None
+    sp.search("genre:pop year:2024", limit=5)
+    assert len(upstream.calls) == 2
@@ -0,0 +1,101 @@
+import numpy as np
+
+from src.ml.feature_matrix import MODEL_FEATURES
+from src.recommender.playlist_engine import PlaylistEngine
+from src.recommender.track_index import TrackIndex, catalog_track
+
+
+def make_catalog(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = {
+        "tempo_bpm": rng.uniform(60, 180, n),
+        "spectral_centroid_mean": rng.uniform(500, 5000, n),
+        "zcr_mean": rng.uniform(0.01, 0.2, n),
+        "mfcc_mean": rng.normal(0, 5, n),
+        "mfcc_std": rng.uniform(10, 60, n),
+    }
+    tracks = [catalog_track({"id": f"t{i}", "name": f"Track {i}", "artist": "A"}) for i in range(n)]
+    genres = rng.choice(["pop", "rock", "jazz"], n).tolist()
+    return rows, tracks, genres
+
+
+def brute_force(index, q, k, genre=None):
+    d = np.sqrt(((np.asarray(index.vectors) - q) ** 2).sum(axis=1))
+    if genre is not None:
+        d[np.asarray(index.genre_codes) != index.genres.index(genre)] = np.inf
+    return np.argsort(d, kind="stable")[:k]
+
+
+def test_kdtree_matches_brute_force():
+    rows, tracks, genres = make_catalog()
+    index = TrackIndex.build(rows, tracks, genres, leaf_size=16)
+    rng = np.random.default_rng(1)
+
+    for _ in range(50):
+        q = rng.normal(size=len(MODEL_FEATURES)).astype(np.float32)
+        pos, dist = index.query(q, k=10)
+        assert list(pos) == list(brute_force(index, q, 10))
+        assert np.all(np.diff(dist) >= 0)
+
+        pos, _ = index.query(q, k=5, genre="jazz")
+        assert list(pos) == list(brute_force(index, q, 5, "jazz"))
+
+    assert len(index.query(q, k=5, genre="polka")[0]) == 0
+
+
+def test_saved_index_is_memory_mapped(tmp_path):
+    rows, tracks, genres = make_catalog(500)
+    built = TrackIndex.build(rows, tracks, genres)
+    built.save(tmp_path)
+
+    loaded = TrackIndex.load(tmp_path)
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.vectors.dtype == np.float32
+
+    features = {k: float(v[7]) for k, v in rows.items()}
+    pos, dist = loaded.query(loaded.vector(features), k=3)
+    assert loaded.track(int(pos[0]))["id"] == "t7"
+    assert dist[0] < 1e-3
+    assert list(pos) == list(built.query(built.vector(features), k=3)[0])
+
+
+class FakeUserClient:
+    def __init__(self):
+        self.calls = 0
+
+    def recommend_tracks(self, seed_genres=None, seed_tracks=None, limit=25):
+        self.calls += 1
+        return [{"id": f"s{i}", "name": f"Spotify {i}"} for i in range(limit)]
+
+
+def test_recommend_ranked_prefers_the_local_index():
+    rows, tracks, genres = make_catalog()
+    index = TrackIndex.build(rows, tracks, genres)
+    sp = FakeUserClient()
+    engine = PlaylistEngine(sp, index=index)
+
+    features = {k: float(v[0]) for k, v in rows.items()}
+    ranked = engine.recommend_ranked(genre=genres[0], features=features, limit=10)
+    assert len(ranked) == 10
+    assert ranked[0]["track"]["id"] == "t0"
+    assert sp.calls == 0
+
+    # a seed track from the index, itself left out of the results
+    ranked = engine.recommend_ranked(genre=genres[0], seed_track_ids=["t0"], limit=10)
+    assert sp.calls == 0
+    assert "t0" not in {r["track"]["id"] for r in ranked}
+
+
+def test_cold_areas_fall_back_to_spotify():
+    rows, tracks, genres = make_catalog()
+    sp = FakeUserClient()
+    engine = PlaylistEngine(sp, index=TrackIndex.build(rows, tracks, genres))
+
+    far_away = {"tempo_bpm": 1000.0, "spectral_centroid_mean": 50000.0, "zcr_mean": 5.0, "mfcc_mean": 100.0, "mfcc_std": 500.0}
+    ranked = engine.recommend_ranked(genre="pop", features=far_away, limit=10)
+    assert sp.calls == 1
+    assert [r["track"]["id"] for r in ranked] == [f"s{i}" for i in range(10)]
+
+    # no index at all behaves as before
+    ranked = PlaylistEngine(sp, index=None).recommend_ranked(genre="pop", limit=5)
+    assert len(ranked) == 5